@@ -1,2 +1,5 @@
 from pyRDDLGym.core.env import RDDLEnv
+from pyRDDLGym.core.domain import CompiledDomain
 from pyRDDLGym.registration import make
+from pyRDDLGym.core.vector_env import RDDLSubprocVectorEnv, RDDLVectorEnv
+from pyRDDLGym.core.async_env import AsyncRDDLEnv, pipelined_rollout
@@ -0,0 +1,183 @@
+import asyncio
+from gymnasium.error import ClosedEnvironmentError
+import inspect
+import queue
+import threading
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+
+def _deliver(slots, future, result, error):
+    
+    # the slot is only released once the worker has served the request, even
+    # if the caller stopped waiting for it
+    slots.release()
+    if future.cancelled():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class AsyncRDDLEnv:
+    '''Wraps a RDDL environment (e.g., RDDLEnv, RDDLVectorEnv or
+    RDDLSubprocVectorEnv) so that reset() and step() can be awaited from an
+    asyncio event loop, while the environment is simulated in a dedicated
+    worker thread. Requests to the same environment are served in the order in
+    which they were made, and at most max_pending requests can be in flight at
+    once, so callers that run ahead of the simulation wait for it (backpressure).
+
+    Simulation therefore overlaps with any other work of the event loop, such
+    as the inference of a policy, e.g., when several environments are awaited 
+    at once with asyncio.gather(). To overlap the simulation of step k + 1 with
+    the inference on step k for a vector environment, split it into two vector
+    environments of half the size and pass their wrappers to 
+    pipelined_rollout(), which computes the actions of each half while the 
+    other half is simulated.
+    '''
+
+    def __init__(self, env: Any, max_pending: int=1) -> None:
+        '''Creates a new asynchronous wrapper of the given environment, and
+        starts its worker thread.
+
+        :param env: the environment to wrap, which should not be used directly
+        while it is wrapped
+        :param max_pending: the maximum number of requests (calls to reset or
+        step) that can be in flight at once
+        '''
+        if max_pending < 1:
+            raise ValueError(f'max_pending must be >= 1, got {max_pending}.')
+        self.env = env
+        self.max_pending = max_pending
+        self.observation_space = env.observation_space
+        self.action_space = env.action_space
+        self.closed = False
+
+        # the number of in flight requests is bounded by a semaphore of the
+        # event loop, which is created on first use inside each loop
+        self._slots = None
+        self._slots_loop = None
+        self._requests = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._worker, name=f'{type(self).__name__}-worker', daemon=True)
+        self._thread.start()
+
+    def _worker(self):
+        while True:
+            request = self._requests.get()
+            if request is None:
+                break
+            (loop, slots, future, method, args, kwargs) = request
+            result, error = None, None
+            try:
+                result = getattr(self.env, method)(*args, **kwargs)
+            except BaseException as e:
+                error = e
+            
+            # the event loop may have been closed while the request was served,
+            # in which case nobody is waiting for the result
+            try:
+                loop.call_soon_threadsafe(_deliver, slots, future, result, error)
+            except RuntimeError:
+                pass
+
+    async def _submit(self, method, *args, **kwargs):
+        if self.closed:
+            raise ClosedEnvironmentError(
+                f'{method}() was called on a closed environment.')
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._slots_loop = loop
+
+        # wait for a free slot, which is released once the request is served
+        slots = self._slots
+        await slots.acquire()
+        future = loop.create_future()
+        self._requests.put((loop, slots, future, method, args, kwargs))
+        return await future
+
+    async def reset(self, seed: Optional[int]=None,
+                    options: Optional[Any]=None) -> Tuple[Any, Any]:
+        '''Resets the wrapped environment in the worker thread, and returns its
+        observation and info.
+
+        :param seed: optional RNG seed for the environment
+        :param options: optional reset options passed to the environment
+        '''
+        return await self._submit('reset', seed=seed, options=options)
+
+    async def step(self, actions: Any) -> Tuple[Any, Any, Any, Any, Any]:
+        '''Steps the wrapped environment in the worker thread, and returns its
+        observation, reward, terminated and truncated flags and info.
+
+        :param actions: the actions passed to the environment
+        '''
+        return await self._submit('step', actions)
+
+    async def close(self) -> None:
+        '''Waits for all requests in flight to be served, then stops the worker
+        thread and closes the wrapped environment.'''
+        if self.closed:
+            return
+        self.closed = True
+        self._requests.put(None)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._thread.join)
+        self.env.close()
+
+
+async def pipelined_rollout(envs: Sequence[AsyncRDDLEnv],
+                            policy_fn: Callable[[Any], Any],
+                            steps: int,
+                            seed: Optional[int]=None) -> List[Any]:
+    '''Simulates the given wrapped environments (e.g., two halves of a vector
+    environment) for a number of steps in a pipeline, in which the actions of 
+    each environment are computed from its last observation while the other 
+    environments are simulated in their worker threads. Returns the sum of the
+    rewards of each environment over all steps.
+    
+    The environments should reset automatically when their episodes end, as
+    vector environments do.
+    
+    :param envs: the wrapped environments, which are stepped in turn
+    :param policy_fn: a function or coroutine function mapping an observation
+    of an environment to its actions, which is called in the event loop
+    :param steps: the number of steps to simulate of each environment
+    :param seed: optional RNG seed, which is offset by the index of each 
+    environment to seed it
+    '''
+    results = await asyncio.gather(*(
+        env.reset(seed=None if seed is None else seed + index)
+        for (index, env) in enumerate(envs)))
+    observations = [obs for (obs, _) in results]
+    returns = [0.0] * len(envs)
+    pending = [None] * len(envs)
+    
+    def _receive(index):
+        obs, reward, *_ = pending[index].result()
+        observations[index] = obs
+        returns[index] = returns[index] + reward
+        pending[index] = None
+    
+    try:
+        for _ in range(steps):
+            for (index, env) in enumerate(envs):
+                
+                # wait for the previous step of this environment, while the 
+                # other environments are still being simulated
+                if pending[index] is not None:
+                    await asyncio.wait([pending[index]])
+                    _receive(index)
+                actions = policy_fn(observations[index])
+                if inspect.isawaitable(actions):
+                    actions = await actions
+                pending[index] = asyncio.ensure_future(env.step(actions))
+        for index in range(len(envs)):
+            await asyncio.wait([pending[index]])
+            _receive(index)
+    finally:
+        for task in pending:
+            if task is not None:
+                task.cancel()
+    return returns
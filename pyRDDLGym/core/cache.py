@@ -0,0 +1,158 @@
+import hashlib
+import importlib.metadata
+import os
+import pickle
+import tempfile
+from typing import Any, Dict, Optional
+
+from pyRDDLGym.core.debug.exception import raise_warning
+
+# bumped whenever the layout of cached entries changes
+CACHE_FORMAT = 1
+CACHE_DIR_ENV = 'PYRDDLGYM_CACHE_DIR'
+CACHE_EXT = '.pkl'
+
+
+def _package_version():
+    try:
+        return importlib.metadata.version('pyRDDLGym')
+    except importlib.metadata.PackageNotFoundError:
+        return 'unknown'
+
+
+class RDDLCompilationCache:
+    '''A persistent cache on disk of the artifacts produced by compiling a RDDL
+    domain and instance (e.g., the model, initial values, CPF levels, traced
+    expression information and action and state bounds). Entries are keyed by
+    a hash of the contents of the domain and instance files and the version of
+    pyRDDLGym, and the least recently used entries are evicted once the total
+    size of the cache exceeds its budget.
+
+    Entries are stored with pickle, so the cache directory must not be writable
+    by untrusted users.
+    '''
+
+    def __init__(self, directory: Optional[str]=None,
+                 max_bytes: int=1024 * 1024 * 1024) -> None:
+        '''Creates a new cache of compiled RDDL models.
+
+        :param directory: the directory where entries are stored, defaults to
+        the value of the PYRDDLGYM_CACHE_DIR environment variable if set, and
+        otherwise to ~/.cache/pyRDDLGym
+        :param max_bytes: approximate budget in bytes of the total size of all
+        entries in the directory
+        '''
+        if directory is None:
+            directory = os.environ.get(CACHE_DIR_ENV, None)
+        if directory is None:
+            directory = os.path.join(os.path.expanduser('~'), '.cache', 'pyRDDLGym')
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(domain: Optional[str], instance: Optional[str]) -> Optional[str]:
+        '''Returns the key of the entry for the given domain and instance files,
+        or None if either of them is not a file, in which case nothing is cached.
+
+        :param domain: the path to the domain rddl
+        :param instance: the path to the instance rddl
+        '''
+        for path in (domain, instance):
+            if not (isinstance(path, (str, os.PathLike)) and os.path.isfile(path)):
+                return None
+        digest = hashlib.sha256()
+        digest.update(f'{_package_version()}:{CACHE_FORMAT}'.encode('utf-8'))
+        for path in (domain, instance):
+            with open(path, 'rb') as file:
+                contents = file.read()
+            digest.update(len(contents).to_bytes(8, 'little'))
+            digest.update(contents)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + CACHE_EXT)
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        '''Returns the entry with the given key, or None if it is not cached or
+        cannot be read.'''
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                entry = pickle.load(file)
+            os.utime(path)
+        except Exception:
+            return None
+        return entry
+
+    def store(self, key: str, entry: Dict[str, Any]) -> None:
+        '''Writes the entry with the given key to disk, replacing any existing
+        entry with that key, and evicts the least recently used entries if the
+        cache exceeds its budget. Failures to write (e.g., of entries that 
+        cannot be pickled) are reported as warnings and otherwise ignored.'''
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as file:
+                    pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_path, self._path(key))
+            except BaseException:
+                os.remove(temp_path)
+                raise
+        except Exception as e:
+            raise_warning(f'Compiled model could not be saved to the cache in '
+                          f'{self.directory}: {type(e).__name__}: {e}', 'red')
+            return
+        self._evict()
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(CACHE_EXT):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+        return entries
+
+    def _evict(self):
+        try:
+            entries = sorted(self._entries())
+        except OSError:
+            return
+        total = sum(size for (_, size, _) in entries)
+        for (_, size, name) in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self) -> None:
+        '''Removes all entries from the cache.'''
+        if not os.path.isdir(self.directory):
+            return
+        for (_, _, name) in self._entries():
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+
+_DEFAULT_CACHE = None
+
+
+def default_compilation_cache() -> Optional[RDDLCompilationCache]:
+    '''Returns the cache used by pyRDDLGym.make, which is stored in the
+    directory given by the PYRDDLGYM_CACHE_DIR environment variable, or None
+    if it is not set (i.e., caching on disk is opt-in).'''
+    global _DEFAULT_CACHE
+    directory = os.environ.get(CACHE_DIR_ENV, None)
+    if not directory:
+        return None
+    if _DEFAULT_CACHE is None or _DEFAULT_CACHE.directory != directory:
+        _DEFAULT_CACHE = RDDLCompilationCache(directory)
+    return _DEFAULT_CACHE
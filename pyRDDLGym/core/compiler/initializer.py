@@ -1,10 +1,11 @@
 import numpy as np
-from typing import Dict, Optional, Union
+from typing import Any, Dict, Optional, Union
 
 from pyRDDLGym.core.compiler.model import RDDLPlanningModel
 from pyRDDLGym.core.debug.exception import (
     RDDLInvalidObjectError,
-    RDDLTypeError
+    RDDLTypeError,
+    RDDLValueOutOfRangeError
 )
 from pyRDDLGym.core.debug.logger import Logger
 
@@ -126,6 +127,52 @@ class RDDLValueInitializer:
         
         return np_init_values
     
+    def cast(self, var: str, values: Any) -> Union[np.ndarray, np.integer, np.floating, bool]:
+        '''Checks that the given values of a variable match its shape and type,
+        and casts them to a value of the same form as the initial values of 
+        the variable (e.g., a numpy array or a scalar). Values of enumerated 
+        types can be given as objects or as their canonical indices.
+        
+        :param var: the name of the (lifted) variable
+        :param values: the values of the variable
+        '''
+        rddl = self.rddl
+        prange = rddl.variable_ranges.get(var, None)
+        if prange is None:
+            raise RDDLTypeError(
+                f'Variable <{var}> is not defined, '
+                f'must be one of {set(rddl.variable_ranges.keys())}.')
+        
+        # domain objects are converted to integers
+        values = np.asarray(values)
+        if prange in rddl.enum_types:
+            if values.dtype.kind in {'U', 'S', 'O'}:
+                literals = np.ravel(values).tolist()
+                values = np.reshape(self._objects_to_ints(literals, prange, var), 
+                                    values.shape)
+            else:
+                num_objects = len(rddl.type_to_objects[prange])
+                if values.size and (np.min(values) < 0 or np.max(values) >= num_objects):
+                    raise RDDLInvalidObjectError(
+                        f'Values {values} assigned to variable <{var}> are not '
+                        f'valid indices of objects of type <{prange}>.')
+            prange = 'int'
+        
+        # check the shape and cast to the required type
+        shape = rddl.object_counts(rddl.variable_params[var])
+        if values.shape != shape:
+            raise RDDLValueOutOfRangeError(
+                f'Values for variable <{var}> must be of shape {shape}, '
+                f'got array of shape {values.shape}.')
+        dtype = RDDLValueInitializer.NUMPY_TYPES[prange]
+        if values.dtype.kind in {'U', 'S', 'O'} or not np.can_cast(values, dtype):
+            raise RDDLTypeError(
+                f'Values {values} for variable <{var}> '
+                f'cannot all be cast to required type <{prange}>.')
+        if shape:
+            return np.array(values, dtype=dtype)
+        return dtype(values)
+    
     def _objects_to_ints(self, literals, prange, var):
         is_scalar = isinstance(literals, str)
         if is_scalar:
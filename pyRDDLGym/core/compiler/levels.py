@@ -1,4 +1,4 @@
-from typing import Dict, Optional, List
+from typing import Dict, Iterable, Optional, List, Set
 
 from pyRDDLGym.core.compiler.model import RDDLPlanningModel
 from pyRDDLGym.core.debug.exception import (
@@ -184,6 +184,69 @@ class RDDLLevelAnalysis:
                     f'{fluent_type} CPF <{cpf}> is not defined '
                     f'in cpfs {{...}} block.')
                     
+    # ===========================================================================
+    # liveness analysis
+    # ===========================================================================
+    
+    def compute_dead_cpfs(self) -> List[str]:
+        '''Returns the interm-fluent and derived-fluent CPFs whose values are 
+        never read, directly or indirectly, by any next-state or observation 
+        CPF, the reward, the constraints or the termination conditions.
+        '''
+        rddl = self.rddl
+        graph = self.build_call_graph()
+        
+        # next-state and observation CPFs, and anything read outside the CPFs
+        live = {name for name in graph 
+                if rddl.variable_types.get(name, name) 
+                not in {'interm-fluent', 'derived-fluent'}}
+        roots = {}
+        for exprs in ([rddl.reward], rddl.preconditions, rddl.invariants, 
+                      rddl.terminations):
+            self._update_call_graph(roots, 'roots', exprs)
+        live.update(roots.get('roots', set()))
+        
+        # mark everything reachable from the live set in the call graph
+        live = _reachable(graph, live)
+        dead = sorted(name for name in graph if name not in live)
+        
+        # log pruned CPFs to file
+        if self.logger is not None:
+            dead_info = '\n\t'.join(f'{rddl.variable_types[name]} {name}'
+                                    for name in dead)
+            self.logger.log(f'[info] computed CPFs that are never read:\n' 
+                            f'\t{dead_info}\n')
+        
+        return dead
+    
+    def compute_required_cpfs(self, exprs: Iterable[Expression]) -> Set[str]:
+        '''Returns the CPFs whose values are read, directly or indirectly, by
+        the given expressions (e.g., the reward).
+        '''
+        graph = self.build_call_graph()
+        roots = {}
+        self._update_call_graph(roots, 'roots', list(exprs))
+        required = _reachable(graph, roots.get('roots', set()))
+        return {name for name in required if name in graph}
+    
+    def compute_dependent_cpfs(self, variables: Iterable[str]) -> Set[str]:
+        '''Returns the CPFs whose values depend, directly or indirectly, on the
+        values of any of the given variables (e.g., the action-fluents).
+        '''
+        graph = self.build_call_graph()
+        variables = set(variables)
+        dependent = {}
+        
+        def _depends(name):
+            if name in variables:
+                return True
+            result = dependent.get(name, None)
+            if result is None:
+                result = dependent[name] = any(map(_depends, graph.get(name, [])))
+            return result
+        
+        return {name for name in graph if _depends(name)}
+    
     # ===========================================================================
     # topological sort
     # ===========================================================================
@@ -233,6 +296,18 @@ class RDDLLevelAnalysis:
 # helper functions for performing topological sort
 # ===========================================================================
 
+
+def _reachable(graph, roots):
+    reached = set(roots)
+    stack = list(reached)
+    while stack:
+        var = stack.pop()
+        for dep in graph.get(var, []):
+            if dep not in reached:
+                reached.add(dep)
+                stack.append(dep)
+    return reached
+
     
 def _topological_sort(graph):
     order = []
@@ -661,7 +661,34 @@ class RDDLPlanningModel(metaclass=ABCMeta):
         
         else:
             return self.is_non_fluent_expression(expr.args)
-    
+
+    def is_deterministic_expression(self, expr: Expression) -> bool:
+        '''Determines whether or not expression is deterministic, i.e. does not
+        sample from any probability distribution other than the degenerate
+        KronDelta and DiracDelta distributions.
+        '''
+        if isinstance(expr, (tuple, list, set)):
+            for arg in expr:
+                if not self.is_deterministic_expression(arg):
+                    return False
+            return True
+
+        elif not isinstance(expr, Expression):
+            return True
+
+        etype, op = expr.etype
+        if etype == 'constant':
+            return True
+
+        elif etype == 'randomvar' and op not in {'KronDelta', 'DiracDelta'}:
+            return False
+
+        elif etype == 'randomvector':
+            return False
+
+        else:
+            return self.is_deterministic_expression(expr.args)
+
     def expr_to_str(self) -> Dict[str, Any]:
         '''Returns a dictionary containing string representations of all 
         expressions in the current RDDL.
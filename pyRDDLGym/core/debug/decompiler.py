@@ -1,4 +1,7 @@
-from typing import Dict, List, Union
+import gzip
+import io
+import os
+from typing import Dict, List, Optional, TextIO, Union
 
 from pyRDDLGym.core.parser.expr import Expression
 from pyRDDLGym.core.parser.cpf import CPF
@@ -44,24 +47,51 @@ class RDDLDecompiler:
     
     def decompile_domain(self, rddl) -> str:
         '''Converts a RDDL model to a RDDL domain description file.'''
-        decompiled = self.decompile_exprs(rddl, level=2)
+        stream = io.StringIO()
+        self._write_domain(rddl, stream)
+        return stream.getvalue()
+    
+    def write_domain(self, rddl, file: Union[str, os.PathLike, TextIO],
+                     compress: Optional[bool]=None) -> None:
+        '''Writes the RDDL domain description of a RDDL model to a file, one 
+        CPF or constraint at a time, so that large (e.g., grounded) models can be
+        exported without building the whole description in memory. The text 
+        written is the same as returned by decompile_domain().
+        
+        :param rddl: the RDDL model to convert
+        :param file: the path of the file to write, or a writable text file-like
+        object (e.g., sys.stdout)
+        :param compress: whether to compress the file with gzip, defaults to 
+        whether its path ends with .gz (ignored for file-like objects)
+        '''
+        if isinstance(file, (str, os.PathLike)):
+            if compress is None:
+                compress = os.fspath(file).endswith('.gz')
+            opener = gzip.open if compress else open
+            with opener(file, 'wt', encoding='utf-8') as stream:
+                self._write_domain(rddl, stream)
+        else:
+            self._write_domain(rddl, file)
+    
+    def _write_domain(self, rddl, stream):
+        stream.write(f'domain {rddl.domain_name} {{\n')
         
-        decompiled_types = ''
         if rddl.type_to_objects:
-            decompiled_types = '\n\ttypes {'
+            stream.write('\n\ttypes {')
             for (name, values) in rddl.type_to_objects.items():
                 if name in rddl.enum_types:
-                    decompiled_types += f'\n\t\t{name}: {{ ' + \
-                        ', '.join([f'@{v}' for v in values]) + ' };'
+                    stream.write(f'\n\t\t{name}: {{ ' + \
+                        ', '.join([f'@{v}' for v in values]) + ' };')
                 else:
-                    decompiled_types += f'\n\t\t{name}: object;'
-            decompiled_types += '\n\t};'
+                    stream.write(f'\n\t\t{name}: object;')
+            stream.write('\n\t};')
+        stream.write('\n')
         
-        decompiled_pvars = '\n\tpvariables {'
+        stream.write('\n\tpvariables {')
         for pvars in (rddl.non_fluents, rddl.derived_fluents, rddl.interm_fluents, 
                       rddl.state_fluents, rddl.observ_fluents, rddl.action_fluents):
             if pvars:
-                decompiled_pvars += '\n'
+                stream.write('\n')
             for name in pvars:
                 prange = rddl.variable_ranges[name]
                 ptype = rddl.variable_types[name]
@@ -74,52 +104,30 @@ class RDDLDecompiler:
                 if prange not in ['real', 'int', 'bool']:
                     dv = f'@{dv}'
                 if ptype in ['interm-fluent', 'derived-fluent', 'observ-fluent']:
-                    decompiled_pvars += f'\n\t\t{name}{decompiled_params} : ' + \
-                                        f'{{ {ptype}, {prange} }};'
+                    stream.write(f'\n\t\t{name}{decompiled_params} : '
+                                 f'{{ {ptype}, {prange} }};')
                 else:
-                    decompiled_pvars += f'\n\t\t{name}{decompiled_params} : ' + \
-                                        f'{{ {ptype}, {prange}, default = {dv} }};'
-        decompiled_pvars += '\n\t};'
-        
-        decompiled_cpfs = '\n\tcpfs {'
-        for (name, expr) in decompiled['cpfs'].items():
-            decompiled_cpfs += f'\n\n\t\t{name} = {expr};'
-        decompiled_cpfs += '\n\t};'
-        
-        decompiled_reward = f'\n\treward = {decompiled["reward"]};'
+                    stream.write(f'\n\t\t{name}{decompiled_params} : '
+                                 f'{{ {ptype}, {prange}, default = {dv} }};')
+        stream.write('\n\t};\n')
         
-        decompiled_invariants = ''
-        if decompiled['invariants']:
-            decompiled_invariants = '\n\n\tstate-invariants {'
-            for expr in decompiled['invariants']:
-                decompiled_invariants += f'\n\t\t{expr};'
-            decompiled_invariants += '\n\t};'
+        stream.write('\n\tcpfs {')
+        for (name, (_, expr)) in rddl.cpfs.items():
+            stream.write(f'\n\n\t\t{name} = {self.decompile_expr(expr, 2)};')
+        stream.write('\n\t};\n')
         
-        decompiled_preconds = ''
-        if decompiled['preconditions']:
-            decompiled_preconds = '\n\n\taction-preconditions {'
-            for expr in decompiled['preconditions']:
-                decompiled_preconds += f'\n\t\t{expr};'
-            decompiled_preconds += '\n\t};'
+        stream.write(f'\n\treward = {self.decompile_expr(rddl.reward, 2)};')
         
-        decompiled_terminals = ''
-        if decompiled['terminations']:
-            decompiled_terminals = '\n\n\ttermination {'
-            for expr in decompiled['terminations']:
-                decompiled_terminals += f'\n\t\t{expr};'
-            decompiled_terminals += '\n\t};'
+        for (block, exprs) in (('state-invariants', rddl.invariants),
+                               ('action-preconditions', rddl.preconditions),
+                               ('termination', rddl.terminations)):
+            if exprs:
+                stream.write(f'\n\n\t{block} {{')
+                for expr in exprs:
+                    stream.write(f'\n\t\t{self.decompile_expr(expr, 2)};')
+                stream.write('\n\t};')
         
-        decompiled_domain = (
-            f'domain {rddl.domain_name} {{'
-            f'\n{decompiled_types}'
-            f'\n{decompiled_pvars}'
-            f'\n{decompiled_cpfs}'
-            f'\n{decompiled_reward}'
-            f'{decompiled_invariants}'
-            f'{decompiled_preconds}'
-            f'{decompiled_terminals}'
-            f'\n}}')
-        return decompiled_domain
+        stream.write('\n}')
         
     def _decompile(self, expr, enclose, level):
         etype, _ = expr.etype
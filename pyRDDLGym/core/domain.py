@@ -0,0 +1,85 @@
+from typing import Type
+
+from pyRDDLGym.core.compiler.model import RDDLLiftedModel
+from pyRDDLGym.core.debug.exception import RDDLParseError
+from pyRDDLGym.core.env import RDDLEnv
+from pyRDDLGym.core.parser.parser import RDDLParser
+from pyRDDLGym.core.parser.rddl import RDDL
+from pyRDDLGym.core.parser.reader import RDDLReader
+from pyRDDLGym.core.simulator import RDDLSimulator
+
+# artifacts of the simulator that do not depend on the objects of the instance
+DOMAIN_ARTIFACTS = ('settings', 'levels', 'dead_cpfs')
+
+
+class CompiledDomain:
+    '''A RDDL domain that is read and parsed once, and then bound to any number
+    of instances. The parsed domain, as well as the dependency graph and order
+    of evaluation of the CPFs computed for the first instance, are shared by
+    all models and environments created from it, so sweeps over many instances
+    of the same domain only pay for the instance-specific compilation (i.e., 
+    the objects, groundings and initial values of the model, and the traced
+    information of the expressions, whose shapes depend on the objects).
+    '''
+    
+    def __init__(self, domain: str) -> None:
+        '''Reads and parses the given RDDL domain.
+        
+        :param domain: the path to the domain rddl
+        '''
+        self.domain = domain
+        self._parser = RDDLParser(lexer=None, verbose=False)
+        self._parser.build()
+        self.ast = self._parse(domain, 'domain').domain
+        self._artifacts = None
+    
+    def _parse(self, path, block):
+        rddl = self._parser.parse(RDDLReader.read(path) + '\n')
+        if rddl is None or getattr(rddl, block) is None:
+            raise RDDLParseError(
+                f'{block} {{...}} block is missing in file {path}.')
+        return rddl
+        
+    def load_model(self, instance: str) -> RDDLLiftedModel:
+        '''Returns the model of the domain bound to the given instance.
+        
+        :param instance: the path to the instance rddl
+        '''
+        rddl = self._parse(instance, 'instance')
+        
+        # tracing a model annotates the expressions in its AST with identifiers,
+        # but these are numbered in the order in which the expressions of the 
+        # domain are traced, which does not depend on the instance, so all 
+        # models can share the parsed domain without copying it
+        rddl = RDDL({'domain': self.ast,
+                     'non_fluents': rddl.non_fluents,
+                     'instance': rddl.instance})
+        return RDDLLiftedModel(rddl)
+    
+    def instantiate(self, instance: str, 
+                    base_class: Type[RDDLEnv]=RDDLEnv, 
+                    **env_kwargs) -> RDDLEnv:
+        '''Creates a new gym environment from the domain and the given instance.
+        
+        :param instance: the path to the instance rddl
+        :param base_class: a subclass of RDDLEnv to create
+        :param **env_kwargs: other arguments to pass to the RDDLEnv (the 
+        compiled_cache is not used since the model is compiled here)
+        '''
+        model = self.load_model(instance)
+        
+        # share the CPF levels computed for previous instances with the backend
+        backend = env_kwargs.get('backend', RDDLSimulator)
+        backend_kwargs = env_kwargs.get('backend_kwargs', {})
+        share = backend._compile is RDDLSimulator._compile \
+            and 'artifacts' not in backend_kwargs
+        if share and self._artifacts is not None:
+            env_kwargs['backend_kwargs'] = {**backend_kwargs, 
+                                            'artifacts': self._artifacts}
+        
+        env = base_class(domain=self.domain, instance=instance, model=model,
+                         **env_kwargs)
+        if share:
+            artifacts = env.sampler.artifacts
+            self._artifacts = {key: artifacts[key] for key in DOMAIN_ARTIFACTS}
+        return env
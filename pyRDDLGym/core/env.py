@@ -1,17 +1,25 @@
+import copy
 import gymnasium as gym
-from gymnasium.spaces import Box, Dict, Discrete
+from gymnasium.spaces import Box, Dict, Discrete, MultiBinary, MultiDiscrete
+from gymnasium.spaces import Tuple as TupleSpace
 import numpy as np
 import os
 import pygame
+from types import MappingProxyType
 import typing
-from typing import Any, List, Optional, Type, Tuple
+from typing import Any, Iterator, List, Mapping, Optional, Type, Tuple
 
-from pyRDDLGym.core.compiler.model import RDDLLiftedModel
+from pyRDDLGym.core.cache import RDDLCompilationCache
+from pyRDDLGym.core.compiler.initializer import RDDLValueInitializer
+from pyRDDLGym.core.compiler.model import RDDLLiftedModel, RDDLPlanningModel
 from pyRDDLGym.core.constraints import RDDLConstraints
 from pyRDDLGym.core.debug.exception import (
+    raise_warning,
     RDDLEpisodeAlreadyEndedError,
+    RDDLInvalidActionError,
     RDDLLogFolderError,
-    RDDLTypeError
+    RDDLTypeError,
+    RDDLUndefinedVariableError
 )
 from pyRDDLGym.core.debug.logger import Logger, SimLogger
 from pyRDDLGym.core.parser.parser import RDDLParser
@@ -33,6 +41,46 @@ def _make_dir(log_path):
                     f'Could not create folder at path {root_path}.')
     return log_path
 
+
+class RDDLGroundingIndex(Mapping):
+    '''A read-only mapping from the grounded name of each fluent to a tuple of
+    its lifted fluent and its position in the flat array of values of the 
+    lifted fluent, which is built on first access.'''
+    
+    def __init__(self, model: RDDLPlanningModel, variables: List[str]) -> None:
+        '''Creates a new index of the groundings of the given lifted fluents.
+        
+        :param model: the RDDL model
+        :param variables: the lifted fluents to index
+        '''
+        self.model = model
+        self.variables = list(variables)
+        self._index = None
+    
+    def _build(self):
+        if self._index is None:
+            self._index = {name: (var, position)
+                           for var in self.variables
+                           for (position, name) in enumerate(
+                               self.model.variable_groundings[var])}
+        return self._index
+    
+    def __getitem__(self, name: str) -> Tuple[str, int]:
+        return self._build()[name]
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._build())
+    
+    def __len__(self) -> int:
+        return len(self._build())
+    
+    def ground(self, values: typing.Dict[str, Any]) -> typing.Dict[str, Any]:
+        '''Returns a dict mapping grounded names to the values of the groundings,
+        given a dict mapping lifted fluents to flat arrays of their values.'''
+        return {name: values[var][position] 
+                for (name, (var, position)) in self._build().items()
+                if var in values}
+
     
 class RDDLEnv(gym.Env):
     '''A gym environment class for RDDL domains.'''
@@ -45,7 +93,13 @@ class RDDLEnv(gym.Env):
                  debug_path: Optional[str]=None,
                  log_path: Optional[str]=None,
                  backend: Type[RDDLSimulator]=RDDLSimulator,
-                 backend_kwargs: typing.Dict={}) -> None:
+                 backend_kwargs: typing.Dict={},
+                 flat: bool=False,
+                 compiled_cache: Optional[RDDLCompilationCache]=None,
+                 model: Optional[RDDLLiftedModel]=None,
+                 compact: bool=False,
+                 copy: bool=True,
+                 check_cadence: typing.Union[str, int]='always') -> None:
         '''Creates a new gym environment from the given RDDL domain + instance.
         
         :param domain: the RDDL domain
@@ -64,6 +118,32 @@ class RDDLEnv(gym.Env):
         simulation (currently supports numpy and Jax)
         :param backend_kwargs: dictionary of additional named arguments to
         pass to backend (must not include logger)
+        :param flat: whether observations are returned as a read-only view of
+        one contiguous real-valued array, and actions can be passed as one
+        such array, with the values of all lifted fluents laid out one after 
+        the other (implies vectorized)
+        :param compiled_cache: a cache on disk from which the compiled model is 
+        loaded if the domain and instance were compiled before, and to which it
+        is saved otherwise, None means no caching (not used when debugging, or
+        when the domain or instance is not a file)
+        :param model: the model of the domain and instance if it was already
+        compiled (e.g., by CompiledDomain), in which case the rddl files are not
+        read again and compiled_cache is not used
+        :param compact: whether observations and actions are represented as 
+        dictionaries mapping each lifted fluent to a flat array of the values of
+        its groundings, with one MultiBinary, MultiDiscrete or Box space per
+        lifted fluent, so that the spaces scale with the number of lifted 
+        fluents rather than groundings (implies vectorized, not used with flat)
+        :param copy: whether the observations and state are returned in new
+        dicts of new arrays (if True), or as read-only views of the tensors of
+        the simulator that are only valid until the next call to step or reset
+        and must not be modified (if False), which avoids several allocations
+        per fluent on each step
+        :param check_cadence: when the state invariants and terminations are
+        checked after a step, one of 'always', 'end' (only on the last step of 
+        the horizon), 'never', or a positive integer N (every N steps and on 
+        the last step of the horizon); steps on which they are not checked are
+        never truncated or terminated by them
         '''
         super(RDDLEnv, self).__init__()
         
@@ -71,17 +151,40 @@ class RDDLEnv(gym.Env):
         self.instance_text = instance
         self.enforce_action_constraints = enforce_action_constraints
         self.enforce_count_non_bool = enforce_action_count_non_bool
-        self.vectorized = vectorized
+        if flat and compact:
+            raise_warning('Compact spaces are not used with the flat layout.', 'red')
+            compact = False
+        self.vectorized = vectorized or flat or compact
+        self.flat = flat
+        self.compact = compact
+        self.copy = copy
+        if not (check_cadence in ('always', 'end', 'never') 
+                or (isinstance(check_cadence, int) and check_cadence >= 1)):
+            raise ValueError(
+                f'Check cadence {check_cadence} is invalid, must be one of '
+                f'always, end, never or a positive integer.')
+        self.check_cadence = check_cadence
+        
+        # load the compiled model from the cache
+        if debug_path or model is not None:
+            compiled_cache = None
+        cache_key, entry = None, {}
+        if compiled_cache is not None:
+            cache_key = compiled_cache.key(domain, instance)
+        if cache_key is not None:
+            entry = compiled_cache.load(cache_key) or {}
         
         # read and parse domain and instance
-        reader = RDDLReader(domain, instance)
-        domain = reader.rddltxt
-        parser = RDDLParser(lexer=None, verbose=False)
-        parser.build()
-        rddl = parser.parse(domain)
-        
-        # define the RDDL model
-        self.model = RDDLLiftedModel(rddl)
+        self.model = entry.get('model', model)
+        if self.model is None:
+            reader = RDDLReader(domain, instance)
+            domain = reader.rddltxt
+            parser = RDDLParser(lexer=None, verbose=False)
+            parser.build()
+            rddl = parser.parse(domain)
+        
+            # define the RDDL model
+            self.model = RDDLLiftedModel(rddl)
         self.horizon = self.model.horizon
         self.discount = self.model.discount
         self.max_allowed_actions = self.model.max_allowed_actions 
@@ -101,14 +204,63 @@ class RDDLEnv(gym.Env):
             self.simlogger.clear(overwrite=False)
         
         # define the simulation backend  
+        reuse_artifacts = cache_key is not None \
+            and backend._compile is RDDLSimulator._compile
+        if reuse_artifacts:
+            backend_kwargs = {**backend_kwargs, 
+                              'artifacts': entry.get('simulator', None)}
         self.sampler = backend(self.model,
                                logger=self.logger,
                                keep_tensors=self.vectorized,
                                **backend_kwargs)
         
         # compute the bounds on fluents from the constraints
-        constraints = RDDLConstraints(self.sampler, vectorized=self.vectorized)
-        self._bounds = constraints.bounds
+        stale = 'model' not in entry
+        bounds = entry.setdefault('bounds', {})
+        self._bounds = bounds.get(self.vectorized, None)
+        if self._bounds is None:
+            constraints = RDDLConstraints(self.sampler, vectorized=self.vectorized)
+            self._bounds = bounds[self.vectorized] = constraints.bounds
+            stale = True
+        
+        # save newly compiled artifacts to the cache
+        if cache_key is not None:
+            if reuse_artifacts:
+                cached = entry.get('simulator', None)
+                if cached is None or cached['traced'] is not self.sampler.traced:
+                    entry['simulator'] = self.sampler.artifacts
+                    stale = True
+            if stale:
+                entry['model'] = self.model
+                compiled_cache.store(cache_key, entry)
+        
+        # evaluate terminations and invariants together unless the backend
+        # checks them in its own way or always checks terminations in step()
+        backend = type(self.sampler)
+        self._fused_checks = \
+            backend.check_state_invariants is RDDLSimulator.check_state_invariants \
+            and backend.check_terminal_states is RDDLSimulator.check_terminal_states \
+            and getattr(self.sampler, 'check_terminations', None) is not None
+        
+        self._compile_spaces()
+        if self.flat:
+            self._allocate_flat_buffer()
+        
+        # set the visualizer
+        self._visualizer = ChartVisualizer(self.model)
+        self._movie_generator = None
+        self.state = None
+        self.image = None
+        self.window = None
+        self.to_render = False
+        self.image_size = None
+        
+        # set roll-out parameters           
+        self.trial = 0
+        self.timestep = 0
+        self.done = False
+            
+    def _compile_spaces(self):
         self._shapes = {var: np.shape(values[0]) 
                         for (var, values) in self._bounds.items()}
         
@@ -132,19 +284,11 @@ class RDDLEnv(gym.Env):
             
         self.action_space = self._rddl_to_gym_bounds(self._action_ranges)
         
-        # set the visualizer
-        self._visualizer = ChartVisualizer(self.model)
-        self._movie_generator = None
-        self.state = None
-        self.image = None
-        self.window = None
-        self.to_render = False
-        self.image_size = None
-        
-        # set roll-out parameters           
-        self.trial = 0
-        self.timestep = 0
-        self.done = False
+        # lay out observations and actions in flat arrays
+        if self.flat:
+            self._compile_flat_layout()
+        elif self.compact:
+            self._compile_compact_spaces(state_ranges)
             
     def _rddl_to_gym_bounds(self, ranges):
         result = Dict()
@@ -189,6 +333,239 @@ class RDDLEnv(gym.Env):
                 
         return result
     
+    # ===========================================================================
+    # flat layout of observations and actions
+    # ===========================================================================
+    
+    def _flat_layout(self, space):
+        layout, offset = {}, 0
+        for var in space:
+            value = np.asarray(self.sampler.init_values[var])
+            layout[var] = (offset, value.shape, value.dtype)
+            offset += value.size
+        return layout, offset
+    
+    def _flat_space(self, space, layout, size):
+        low = np.empty(size, dtype=RDDLValueInitializer.REAL)
+        high = np.empty(size, dtype=RDDLValueInitializer.REAL)
+        for (var, (offset, shape, _)) in layout.items():
+            end = offset + int(np.prod(shape, dtype=np.int64))
+            low[offset:end] = np.ravel(space[var].low)
+            high[offset:end] = np.ravel(space[var].high)
+        return Box(low, high, dtype=RDDLValueInitializer.REAL)
+    
+    def _compile_flat_layout(self):
+        
+        # offset, shape and type of each lifted fluent in the flat arrays
+        self.observation_layout, obs_size = self._flat_layout(self.observation_space)
+        self.action_layout, action_size = self._flat_layout(self.action_space)
+        self.dict_observation_space = self.observation_space
+        self.dict_action_space = self.action_space
+        self.observation_space = self._flat_space(
+            self.dict_observation_space, self.observation_layout, obs_size)
+        self.action_space = self._flat_space(
+            self.dict_action_space, self.action_layout, action_size)
+    
+    def _allocate_flat_buffer(self):
+        
+        # observations are written into one buffer, and exposed as read-only
+        # views of the buffer as a whole and of each fluent
+        self._obs_buffer = np.zeros(self.observation_space.shape, 
+                                    dtype=RDDLValueInitializer.REAL)
+        self._obs_view = self._obs_buffer.view()
+        self._obs_view.setflags(write=False)
+        self.observation_views = {}
+        for (var, (offset, shape, _)) in self.observation_layout.items():
+            end = offset + int(np.prod(shape, dtype=np.int64))
+            self.observation_views[var] = np.reshape(self._obs_view[offset:end], shape)
+    
+    def _write_flat_observation(self, obs):
+        buffer = self._obs_buffer
+        for (var, (offset, shape, _)) in self.observation_layout.items():
+            end = offset + int(np.prod(shape, dtype=np.int64))
+            value = obs.get(var, None)
+            
+            # observations of a POMDP are undefined before the first step
+            if value is None or np.asarray(value).dtype == object:
+                buffer[offset:end] = np.nan
+            else:
+                buffer[offset:end] = np.ravel(value)
+        return self._obs_view
+    
+    def _read_flat_actions(self, actions):
+        actions = np.asarray(actions)
+        if actions.shape != self.action_space.shape:
+            raise RDDLInvalidActionError(
+                f'Flat action array must be of shape {self.action_space.shape}, '
+                f'got array of shape {actions.shape}.')
+        
+        # each action is a view of the array, rounded for non-real actions
+        result = {}
+        for (var, (offset, shape, dtype)) in self.action_layout.items():
+            end = offset + int(np.prod(shape, dtype=np.int64))
+            values = np.reshape(actions[offset:end], shape)
+            if not np.issubdtype(dtype, np.floating):
+                values = np.rint(values)
+            result[var] = values.astype(dtype, copy=False)
+        return result
+    
+    # ===========================================================================
+    # compact spaces of grounded fluents
+    # ===========================================================================
+    
+    def _compact_space(self, ranges):
+        result = Dict()
+        for (var, prange) in ranges.items():
+            size = int(np.prod(self._shapes[var], dtype=np.int64))
+            
+            # enumerated values converted to MultiDiscrete space
+            if prange in self.model.enum_types:
+                num_objects = len(self.model.type_to_objects[prange])
+                result[var] = MultiDiscrete(np.full(size, num_objects))
+            
+            # real values define a box
+            elif prange == 'real':
+                low, high = self._bounds[var]
+                result[var] = Box(np.ravel(low), np.ravel(high), dtype=np.float32)
+            
+            # boolean values converted to MultiBinary space
+            elif prange == 'bool':
+                result[var] = MultiBinary(size)
+            
+            # integer values converted to MultiDiscrete space
+            elif prange == 'int':
+                low, high = self._bounds[var]
+                low = np.maximum(np.ravel(low), np.iinfo(np.int32).min)
+                high = np.minimum(np.ravel(high), np.iinfo(np.int32).max)
+                low = np.broadcast_to(low, (size,)).astype(np.int64)
+                high = np.broadcast_to(high, (size,)).astype(np.int64)
+                result[var] = MultiDiscrete(high - low + 1, start=low)
+            
+            else:
+                raise RDDLTypeError(
+                    f'Type <{prange}> of fluent <{var}> is not valid, '
+                    f'must be an enumerated or primitive type (real, int, bool).')
+        return result
+    
+    def _compile_compact_spaces(self, state_ranges):
+        self.observation_space = self._compact_space(state_ranges)
+        self.action_space = self._compact_space(self._action_ranges)
+        self.observation_index = RDDLGroundingIndex(self.model, state_ranges)
+        self.action_index = RDDLGroundingIndex(self.model, self._action_ranges)
+    
+    def _read_compact_actions(self, actions):
+        result, copied = {}, set()
+        for (name, value) in actions.items():
+            
+            # flat array of the values of a lifted fluent
+            noop = self._noop_actions.get(name, None)
+            if noop is not None:
+                result[name] = np.reshape(value, np.shape(noop))
+                continue
+            
+            # value of a single grounding
+            var, position = self.action_index.get(name, (None, None))
+            if var is None:
+                raise RDDLInvalidActionError(
+                    f'<{name}> is not a valid action-fluent, must be one of '
+                    f'{set(self._noop_actions.keys())} or their groundings.')
+            if var not in copied:
+                result[var] = np.array(result.get(var, self._noop_actions[var]))
+                copied.add(var)
+            result[var].flat[position] = value
+        return result
+    
+    def _compact_observation(self, obs):
+        return {var: np.ravel(value) for (var, value) in obs.items()}
+    
+    @staticmethod
+    def _clone_space(space):
+        
+        # shallow copy that shares the bounds, but samples from its own generator
+        space = copy.copy(space)
+        space._np_random = None
+        if isinstance(space, Dict):
+            space.spaces = {name: RDDLEnv._clone_space(subspace) 
+                            for (name, subspace) in space.spaces.items()}
+        elif isinstance(space, TupleSpace):
+            space.spaces = tuple(map(RDDLEnv._clone_space, space.spaces))
+        return space
+    
+    def clone(self) -> 'RDDLEnv':
+        '''Returns a new environment that shares the compiled model, simulator
+        structures and the bounds of the gym spaces with this environment, but 
+        has its own state, random number generators (including those of its gym
+        spaces) and visualizer. Should only be called on an environment that 
+        does not log to file, and that has not been rendered.
+        '''
+        env = copy.copy(self)
+        env.sampler = self.sampler.clone()
+        for name in ('observation_space', 'action_space', 
+                     'dict_observation_space', 'dict_action_space'):
+            space = getattr(self, name, None)
+            if space is not None:
+                setattr(env, name, RDDLEnv._clone_space(space))
+        env._visualizer = copy.deepcopy(
+            self._visualizer, memo={id(self.model): self.model})
+        if self.flat:
+            env._allocate_flat_buffer()
+        env.state = None
+        env.image = None
+        env.window = None
+        env.to_render = False
+        env.trial = 0
+        env.timestep = 0
+        env.done = False
+        return env
+    
+    # ===========================================================================
+    # changing the instance without compiling it again
+    # ===========================================================================
+    
+    def _lifted_values(self, values):
+        rddl = self.model
+        lifted = {}
+        for (name, value) in values.items():
+            if name in rddl.variable_types:
+                lifted[name] = value
+                continue
+            
+            # grounded values are written into a copy of the current tensor
+            var, objects = RDDLPlanningModel.parse_grounded(name)
+            tensor = lifted.get(var, None)
+            if tensor is None:
+                if var not in rddl.variable_types:
+                    raise RDDLUndefinedVariableError(
+                        f'<{name}> is not a valid variable.')
+                tensor = lifted[var] = np.array(self.sampler.init_values[var])
+            tensor[rddl.object_indices(objects)] = rddl.object_to_index.get(value, value)
+        return lifted
+    
+    def set_non_fluents(self, values: typing.Dict[str, Any]) -> None:
+        '''Replaces the values of the given non-fluents without compiling the
+        instance again, and updates the bounds of the gym spaces that depend on
+        them. The new values take effect immediately.
+        
+        :param values: a dict mapping non-fluents to their new values, where
+        lifted non-fluents map to value tensors, and grounded non-fluents map to 
+        scalar values
+        '''
+        self.sampler.set_non_fluents(self._lifted_values(values))
+        constraints = RDDLConstraints(self.sampler, vectorized=self.vectorized)
+        self._bounds = constraints.bounds
+        self._compile_spaces()
+    
+    def set_initial_state(self, values: typing.Dict[str, Any]) -> None:
+        '''Replaces the initial values of the given state-fluents without 
+        compiling the instance again. The new values take effect on the next
+        call to reset().
+        
+        :param values: a dict mapping state-fluents to their new initial values,
+        where lifted state-fluents map to value tensors, and grounded 
+        state-fluents map to scalar values
+        '''
+        self.sampler.set_initial_state(self._lifted_values(values))
+    
     def seed(self, seed: Optional[int]=None) -> List[Optional[int]]:
         self.sampler.seed(seed)
         return [seed]
@@ -225,6 +602,56 @@ class RDDLEnv(gym.Env):
                 fixed_actions[var] = values
         return fixed_actions
 
+    def _cast_boolean_actions(self, actions):
+        cast_actions = {}
+        for (var, values) in actions.items():
+            if self._action_ranges.get(var, '') == 'bool':
+                if np.shape(values):
+                    values = np.asarray(values, dtype=bool)
+                else:
+                    values = bool(values)
+            cast_actions[var] = values
+        return cast_actions
+    
+    @staticmethod
+    def _read_only(value):
+        if isinstance(value, np.ndarray):
+            value = value.view()
+            value.flags.writeable = False
+        return value
+    
+    def _observe(self, obs):
+        sampler = self.sampler
+        
+        # copy the state and produce array outputs for vectorized option
+        if self.copy:
+            self.state = sampler.states
+            if self.vectorized:
+                obs = {var: np.atleast_1d(value) for (var, value) in obs.items()}
+        
+        # expose read-only views of the tensors of the simulator
+        elif self.vectorized:
+            self.state = {var: self._read_only(value) 
+                          for (var, value) in sampler.state.items()}
+            obs = {var: self._read_only(np.atleast_1d(value)) 
+                   for (var, value) in obs.items()}
+        else:
+            state = sampler.state
+            self.state = MappingProxyType(state)
+            obs = self.state if obs is state else MappingProxyType(obs)
+        return obs
+    
+    def _check_due(self):
+        cadence = self.check_cadence
+        if cadence == 'always':
+            return True
+        elif cadence == 'never':
+            return False
+        last = self.timestep + 1 >= self.horizon
+        if cadence == 'end':
+            return last
+        return last or (self.timestep + 1) % cadence == 0
+    
     def step(self, actions: Any) -> Tuple[Any, float, bool, bool, Any]:
         sampler = self.sampler
         
@@ -234,21 +661,41 @@ class RDDLEnv(gym.Env):
                 'current episode has terminated or truncated: please call reset().')
             
         # fix actions and check constraints
-        actions = self._fix_boolean_actions(actions)
+        if self.flat and not isinstance(actions, dict):
+            actions = self._read_flat_actions(actions)
+        elif self.compact:
+            actions = self._read_compact_actions(actions)
+        if self.copy or self.simlogger is not None:
+            actions = self._fix_boolean_actions(actions)
+        else:
+            actions = self._cast_boolean_actions(actions)
         sampler.check_default_action_count(actions, self.enforce_count_non_bool)
         if self.enforce_action_constraints:
             sampler.check_action_preconditions(actions, silent=False)
         
         # sample next state and reward
-        obs, reward, terminated = sampler.step(actions)
-        self.state = sampler.states
-            
-        # produce array outputs for vectorized option
-        if self.vectorized:
-            obs = {var: np.atleast_1d(value) for (var, value) in obs.items()}
+        # the terminal check of the simulator is only skipped for this call,
+        # since backends may not accept it as an argument of step(), and 
+        # backends without the flag always check for terminal states
+        check = self._check_due()
+        check_terminations = getattr(sampler, 'check_terminations', None)
+        if check_terminations is not None:
+            sampler.check_terminations = check and not self._fused_checks
+        try:
+            obs, reward, terminated = sampler.step(actions)
+        finally:
+            if check_terminations is not None:
+                sampler.check_terminations = check_terminations
+        obs = self._observe(obs)
             
         # check if the state invariants are satisfied
-        truncated = not sampler.check_state_invariants(silent=True)
+        truncated = False
+        if check:
+            if self._fused_checks:
+                satisfied, terminated = sampler.check_state_conditions()
+            else:
+                satisfied = sampler.check_state_invariants(silent=True)
+            truncated = not satisfied
         self.done = terminated or truncated
             
         # log to file
@@ -261,6 +708,12 @@ class RDDLEnv(gym.Env):
                 log_action = actions
             self.simlogger.log(log_obs, log_action, reward, self.done, self.timestep)
         
+        # write observation into the flat buffer or flatten it for compact spaces
+        if self.flat:
+            obs = self._write_flat_observation(obs)
+        elif self.compact:
+            obs = self._compact_observation(obs)
+        
         # update step horizon
         self.timestep += 1
         if self.timestep == self.horizon:
@@ -276,15 +729,18 @@ class RDDLEnv(gym.Env):
         
         # reset counters and internal state
         sampler = self.sampler
-        obs, terminated = sampler.reset()
+        check_terminations = getattr(sampler, 'check_terminations', None)
+        if check_terminations is not None:
+            sampler.check_terminations = self.check_cadence != 'never'
+        try:
+            obs, terminated = sampler.reset()
+        finally:
+            if check_terminations is not None:
+                sampler.check_terminations = check_terminations
+        obs = self._observe(obs)
         self.done = terminated
-        self.state = sampler.states
         self.trial += 1
         self.timestep = 0
-        
-        # produce array outputs for vectorized option
-        if self.vectorized:
-            obs = {var: np.atleast_1d(value) for (var, value) in obs.items()}
             
         # update movie generator
         if self._movie_generator is not None and self._visualizer is not None:
@@ -307,9 +763,122 @@ class RDDLEnv(gym.Env):
                     'New Trial\n'
                     '######################################################')
             self.simlogger.log_free(text)
+        
+        # write observation into the flat buffer or flatten it for compact spaces
+        if self.flat:
+            obs = self._write_flat_observation(obs)
+        elif self.compact:
+            obs = self._compact_observation(obs)
             
         return obs, {}
 
+    def rollout(self, policy_fn: typing.Callable[[typing.Dict[str, Any]], typing.Dict[str, Any]],
+                horizon: Optional[int]=None,
+                episodes: int=1,
+                seed: Optional[int]=None) -> typing.Dict[str, Any]:
+        '''Simulates episodes of a policy in a tight loop directly on the
+        simulator, and returns the trajectories in vectorized layout as a dict
+        of preallocated arrays. The current episode of the environment is not
+        modified, and the episodes are not logged or rendered.
+
+        The returned dict contains the lifted states of shape (E, T + 1, ...)
+        including the initial state, the actions of shape (E, T, ...), the
+        observations of shape (E, T, ...) for a POMDP, the rewards and the
+        terminated and truncated flags of shape (E, T), and the number of steps
+        and the discounted returns of each episode of shape (E,). Entries past
+        the end of an episode are zero.
+
+        :param policy_fn: a function mapping a dict of the lifted observed
+        fluents and their values to a dict of lifted action-fluents and their
+        values, where action-fluents that are not specified take default values
+        :param horizon: the maximum number of steps T in each episode
+        (defaults to the horizon of the instance)
+        :param episodes: the number of episodes E to simulate
+        :param seed: optional RNG seed for the episodes, which are sampled from 
+        a generator of their own so that the generator of the environment is 
+        not advanced
+        '''
+        rddl = self.model
+        if horizon is None:
+            horizon = self.horizon
+
+        # simulate on a clone of the sampler that works with lifted tensors
+        sim = self.sampler.clone(rng=np.random.default_rng(seed))
+        sim.keep_tensors = True
+        sim.check_terminations = True
+        noop_actions = sim.noop_actions
+
+        # preallocate trajectory arrays
+        def _allocate(variables, steps):
+            arrays = {}
+            for var in variables:
+                value = np.asarray(sim.init_values[var])
+                arrays[var] = np.zeros((episodes, steps) + value.shape,
+                                       dtype=value.dtype)
+            return arrays
+
+        states = _allocate(rddl.state_fluents, horizon + 1)
+        actions = _allocate(noop_actions, horizon)
+        observs = _allocate(rddl.observ_fluents, horizon) if sim.is_pomdp else None
+        rewards = np.zeros((episodes, horizon), dtype=RDDLValueInitializer.REAL)
+        terminated = np.zeros((episodes, horizon), dtype=bool)
+        truncated = np.zeros((episodes, horizon), dtype=bool)
+        lengths = np.zeros((episodes,), dtype=RDDLValueInitializer.INT)
+        returns = np.zeros((episodes,), dtype=RDDLValueInitializer.REAL)
+
+        for episode in range(episodes):
+            obs, done = sim.reset()
+            for (var, values) in states.items():
+                values[episode, 0] = sim.state[var]
+
+            step, discount = 0, 1.0
+            while not done and step < horizon:
+
+                # write the actions into the trajectory and check them
+                action = policy_fn(obs)
+                for var in action:
+                    if var not in noop_actions:
+                        raise RDDLInvalidActionError(
+                            f'<{var}> is not a valid action-fluent, '
+                            f'must be one of {set(noop_actions.keys())}.')
+                for (var, values) in actions.items():
+                    values[episode, step] = action.get(var, noop_actions[var])
+                action = {var: values[episode, step]
+                          for (var, values) in actions.items()}
+                sim.check_default_action_count(action, self.enforce_count_non_bool)
+                if self.enforce_action_constraints:
+                    sim.check_action_preconditions(action, silent=False)
+
+                # sample next state and reward
+                obs, reward, done = sim.step(action)
+                for (var, values) in states.items():
+                    values[episode, step + 1] = sim.state[var]
+                if observs is not None:
+                    for (var, values) in observs.items():
+                        values[episode, step] = obs[var]
+                rewards[episode, step] = reward
+                returns[episode] += discount * reward
+                discount *= self.discount
+
+                # check termination, invariants and horizon
+                terminated[episode, step] = done
+                if not sim.check_state_invariants(silent=True):
+                    truncated[episode, step] = done = True
+                step += 1
+                if step == horizon:
+                    truncated[episode, step - 1] = done = True
+            lengths[episode] = step
+
+        trajectories = {'state': states, 'action': actions}
+        if observs is not None:
+            trajectories['observ'] = observs
+        trajectories.update({'reward': rewards,
+                             'terminated': terminated,
+                             'truncated': truncated,
+                             'length': lengths,
+                             'return': returns})
+        return trajectories
+
     def pilImageToSurface(self, pilImage):
         return pygame.image.fromstring(
             pilImage.tobytes(), pilImage.size, pilImage.mode).convert()
@@ -1,6 +1,11 @@
 import abc
-import copy
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
 import itertools
+import math
+import multiprocessing
+import numpy as np
+from typing import Optional
 
 from pyRDDLGym.core.compiler.model import RDDLGroundedModel
 from pyRDDLGym.core.debug.exception import (
@@ -15,6 +20,7 @@ from pyRDDLGym.core.debug.exception import (
     RDDLUndefinedVariableError,
     RDDLValueOutOfRangeError
 )
+from pyRDDLGym.core.parser.cpf import CPF
 from pyRDDLGym.core.parser.expr import Expression
 
 AGGREG_OP_TO_STRING_DICT = {
@@ -27,6 +33,56 @@ AGGREG_OP_TO_STRING_DICT = {
     'exists': '|'
 }
 
+# operations that can be evaluated on constants while grounding, which must 
+# match those of the simulator
+FOLD_ARITHMETIC_OPS = {
+    '+': np.add,
+    '-': np.subtract,
+    '*': np.multiply,
+    '/': np.divide
+}
+FOLD_RELATIONAL_OPS = {
+    '>=': np.greater_equal,
+    '<=': np.less_equal,
+    '<': np.less,
+    '>': np.greater,
+    '==': np.equal,
+    '~=': np.not_equal
+}
+FOLD_LOGICAL_OPS = {
+    '^': np.logical_and,
+    '&': np.logical_and,
+    '|': np.logical_or,
+    '~': np.logical_xor,
+    '=>': lambda x, y: np.logical_or(np.logical_not(x), y),
+    '<=>': np.equal
+}
+
+# marks an expression that is not a constant, see RDDLGrounder._constant_value()
+_NOT_CONSTANT = object()
+
+# the value types of grounded expressions, ordered as they are promoted by the
+# simulator, see RDDLGrounder._kind_of()
+_KIND_BOOL, _KIND_INT, _KIND_REAL = 0, 1, 2
+_RANGE_KINDS = {'bool': _KIND_BOOL, 'int': _KIND_INT, 'real': _KIND_REAL}
+_INT_FUNCS = {'sgn', 'round', 'floor', 'ceil', 'div', 'mod'}
+_PROMOTING_FUNCS = {'abs', 'min', 'max', 'fmod', 'pow'}
+
+# the grounder of each worker process, see RDDLGrounder._ground_cpfs_parallel()
+_WORKER_GROUNDER = None
+
+
+def _init_grounding_worker(RDDL_AST, simplify, nonfluent_values):
+    global _WORKER_GROUNDER
+    _WORKER_GROUNDER = RDDLGrounder(RDDL_AST, simplify=simplify)
+    _WORKER_GROUNDER._extract_objects()
+    _WORKER_GROUNDER._index_cpfs()
+    _WORKER_GROUNDER._nonfluent_values = nonfluent_values
+
+
+def _ground_cpfs_in_worker(tasks):
+    return _WORKER_GROUNDER._ground_cpfs_serial(tasks)
+
 
 class BaseRDDLGrounder(metaclass=abc.ABCMeta):
     '''Base class for all grounder classes.
@@ -42,13 +98,55 @@ class BaseRDDLGrounder(metaclass=abc.ABCMeta):
 class RDDLGrounder(BaseRDDLGrounder):
     '''Standard class for grounding RDDL pvariables. Does not support new 
     languages features currently.
+    
+    Grounded expressions are immutable and shared: the grounding of every 
+    subexpression of the domain is memoized by the objects bound to its free 
+    variables, so that e.g. a subexpression that does not depend on the 
+    parameters of its CPF is grounded once for all its groundings, and each 
+    grounded pvariable or constant is represented by a single expression.
+    Subexpressions that sample random variables are never shared, since every 
+    occurrence of them must be sampled independently.
+    
+    Optionally, grounded expressions can also be simplified while grounding:
+    non-fluents are replaced by their values in the instance, operations on 
+    constants are evaluated, if branches with a constant condition are pruned,
+    zero terms of sums and one factors of products are dropped, products with
+    a zero factor are replaced by zero, and conjunctions and disjunctions 
+    (including grounded forall and exists) are short-circuited on constant 
+    operands. A zero term or one factor is only dropped if the type of the 
+    remaining operands is known to be at least as wide as its own, so that 
+    e.g. an int fluent plus a real zero is still real. The simplified model 
+    evaluates to the same values, although random variables in pruned 
+    subexpressions are no longer sampled.
+    
+    The CPFs can also be grounded in parallel by a pool of worker processes,
+    each of which receives the AST once and grounds a contiguous range of the
+    (CPF, objects) pairs. The results are merged in the same order as when 
+    grounding serially, so the grounded model does not depend on the number
+    of workers.
     '''
 
-    def __init__(self, RDDL_AST) -> None:
+    def __init__(self, RDDL_AST, 
+                 simplify: bool=False,
+                 workers: Optional[int]=None,
+                 context: Optional[str]=None) -> None:
         '''Creates a new grounder object for grounding the specified RDDL file.
+        
+        :param RDDL_AST: the AST of the RDDL domain and instance to ground
+        :param simplify: whether to substitute non-fluents and simplify the 
+        grounded expressions
+        :param workers: the number of worker processes among which grounding 
+        of the CPFs is divided, or None to ground them in the current process
+        :param context: the multiprocessing start method (e.g., spawn), or None 
+        to use the default start method
         '''
         super(RDDLGrounder, self).__init__()
+        if workers is not None and not (isinstance(workers, int) and workers >= 1):
+            raise ValueError(f'workers must be None or an int >= 1, got {workers}.')
         self.AST = RDDL_AST
+        self.simplify = simplify
+        self.workers = workers
+        self.context = context
         
         self.fluent_sep = RDDLGroundedModel.FLUENT_SEP
         self.object_sep = RDDLGroundedModel.OBJECT_SEP
@@ -84,14 +182,27 @@ class RDDLGrounder(BaseRDDLGrounder):
         self.terminations = []
         self.preconditions = []
         self.invariants = []
+        
+        # memoized groundings of subexpressions and hash-consed leaves
+        self._subtree_info = {}
+        self._grounded_subtrees = {}
+        self._pvar_nodes = {}
+        self._constant_nodes = {}
+        self._nonfluent_values = {}
+        self._node_kinds = {}
 
     def ground(self) -> RDDLGroundedModel:
         self._extract_objects()
+        self._index_cpfs()
         self._ground_pvariables_and_cpf()
         self._ground_init_state()
         self._ground_init_non_fluents()
+        if self.simplify:
+            self._extract_non_fluent_values()
+        self._ground_cpfs()
         self.reward = self._scan_expr_tree(self.AST.domain.reward, {})
         self._ground_constraints()
+        self._clear_memo()
 
         # update model object
         model = RDDLGroundedModel()        
@@ -185,13 +296,35 @@ class RDDLGrounder(BaseRDDLGrounder):
         else: 
             # in some calls to _generate_name, we do not care about the param dict
             return all_grounded_names
+    
+    def _index_cpfs(self):
+        domain = self.AST.domain
+        cpfs_by_type = {
+            'state-fluent': domain.cpfs[1],
+            'derived-fluent': domain.derived_cpfs,
+            'interm-fluent': domain.intermediate_cpfs,
+            'observ-fluent': domain.observation_cpfs
+        }
+        self.cpf_index = {}
+        for (fluent_type, cpfs) in cpfs_by_type.items():
+            index = self.cpf_index[fluent_type] = {}
+            for cpf in cpfs:
+                index.setdefault(cpf.pvar[1][0], cpf)
+    
+    def _find_cpf(self, fluent_type, name, cpf_name):
+        cpf = self.cpf_index[fluent_type].get(cpf_name, None)
+        if cpf is None:
+            raise RDDLMissingCPFDefinitionError(
+                f'CPF <{name}> is missing a valid definition.')
+        return cpf
 
     def _ground_pvariables_and_cpf(self):
         PRIME = RDDLGroundedModel.NEXT_STATE_SYM
-        all_grounded_state_cpfs = []
-        all_grounded_interim_cpfs = []
-        all_grounded_derived_cpfs = []
-        all_grounded_observ_cpfs = []
+        
+        # the (CPF, objects) pairs to ground, and where to store their results
+        tasks = []
+        cpf_names = []
+        self._cpf_tasks = (cpf_names, tasks)
         for pvariable in self.AST.domain.pvariables:
             name = pvariable.name
             primed_name = (name + PRIME) if pvariable.is_state_fluent() else name
@@ -245,45 +378,27 @@ class RDDLGrounder(BaseRDDLGrounder):
                     self.actionsranges[g] = pvariable.range
               
             elif pvariable.fluent_type == 'state-fluent':
-                cpf = None
-                next_state = name + PRIME
-                for cpfs in self.AST.domain.cpfs[1]:
-                    if cpfs.pvar[1][0] == next_state:
-                        cpf = cpfs
-                        break
-                if cpf is None:
-                    raise RDDLMissingCPFDefinitionError(
-                        f'CPF <{name}> is missing a valid definition.')
-    
+                cpf_name = name + PRIME
+                self._find_cpf(pvariable.fluent_type, name, cpf_name)
                 for g in grounded:
-                    grounded_cpf = self._ground_single_cpf(
-                        cpf, g, grounded_name_to_params_dict[g])
-                    all_grounded_state_cpfs.append(grounded_cpf)
+                    tasks.append((pvariable.fluent_type, cpf_name, g, 
+                                  grounded_name_to_params_dict[g]))
                     next_state = g + PRIME  # update to grounded version, satisfied single-variables too (i.e. not a type)
+                    cpf_names.append(next_state)
                     self.states[g] = pvariable.default
                     self.statesranges[g] = pvariable.range
                     self.nextstates[g] = next_state
                     self.prevstates[next_state] = g
-                    self.cpfs[next_state] = ([], grounded_cpf.expr)
                     self.level_to_cpfs.setdefault(0, []).append(g)
                     self.cpf_to_level[g] = 0
                     
             elif pvariable.fluent_type == 'derived-fluent':
-                cpf = None
-                for cpfs in self.AST.domain.derived_cpfs:
-                    if cpfs.pvar[1][0] == name:
-                        cpf = cpfs
-                        break
-                if cpf is None:
-                    raise RDDLMissingCPFDefinitionError(
-                        f'CPF <{name}> is missing a valid definition.')
-                    
+                self._find_cpf(pvariable.fluent_type, name, name)
                 for g in grounded:
-                    grounded_cpf = self._ground_single_cpf(
-                        cpf, g, grounded_name_to_params_dict[g])
-                    all_grounded_derived_cpfs.append(grounded_cpf)
+                    tasks.append((pvariable.fluent_type, name, g, 
+                                  grounded_name_to_params_dict[g]))
+                    cpf_names.append(g)
                     self.derived[g] = pvariable.default
-                    self.cpfs[g] = ([], grounded_cpf.expr)
                     level = pvariable.level
                     if level is None:
                         level = 1
@@ -291,21 +406,12 @@ class RDDLGrounder(BaseRDDLGrounder):
                     self.cpf_to_level[g] = level
     
             elif pvariable.fluent_type == 'interm-fluent':
-                cpf = None
-                for cpfs in self.AST.domain.intermediate_cpfs:
-                    if cpfs.pvar[1][0] == name:
-                        cpf = cpfs
-                        break
-                if cpf is None:
-                    raise RDDLMissingCPFDefinitionError(
-                        f'CPF <{name}> is missing a valid definition.')
-                    
+                self._find_cpf(pvariable.fluent_type, name, name)
                 for g in grounded:
-                    grounded_cpf = self._ground_single_cpf(
-                        cpf, g, grounded_name_to_params_dict[g])
-                    all_grounded_interim_cpfs.append(grounded_cpf)
+                    tasks.append((pvariable.fluent_type, name, g, 
+                                  grounded_name_to_params_dict[g]))
+                    cpf_names.append(g)
                     self.interm[g] = pvariable.default
-                    self.cpfs[g] = ([], grounded_cpf.expr)
                     level = pvariable.level
                     if level is None:
                         level = 1
@@ -313,32 +419,64 @@ class RDDLGrounder(BaseRDDLGrounder):
                     self.cpf_to_level[g] = level
                     
             elif pvariable.fluent_type == 'observ-fluent':
-                cpf = None
-                for cpfs in self.AST.domain.observation_cpfs:
-                    if cpfs.pvar[1][0] == name:
-                        cpf = cpfs
-                        break
-                if cpf is None:
-                    raise RDDLMissingCPFDefinitionError(
-                        f'CPF <{name}> is missing a valid definition.')
-                    
+                self._find_cpf(pvariable.fluent_type, name, name)
                 for g in grounded:
-                    grounded_cpf = self._ground_single_cpf(
-                        cpf, g, grounded_name_to_params_dict[g])
-                    all_grounded_observ_cpfs.append(grounded_cpf)
+                    tasks.append((pvariable.fluent_type, name, g, 
+                                  grounded_name_to_params_dict[g]))
+                    cpf_names.append(g)
                     self.observ[g] = pvariable.default
                     self.observranges[g] = pvariable.range
-                    self.cpfs[g] = ([], grounded_cpf.expr)
                     self.level_to_cpfs.setdefault(0, []).append(g)
                     self.cpf_to_level[g] = 0
+    
+    def _ground_cpfs(self):
+        cpf_names, tasks = self._cpf_tasks
+        
+        # ground the CPFs, in parallel if requested
+        if self.workers is not None and self.workers > 1 and tasks:
+            exprs = self._ground_cpfs_parallel(tasks)
+        else:
+            exprs = self._ground_cpfs_serial(tasks)
+        for (cpf_name, expr) in zip(cpf_names, exprs):
+            self.cpfs[cpf_name] = ([], expr)
+    
+    def _ground_cpfs_serial(self, tasks):
+        exprs = []
+        for (fluent_type, cpf_name, variable, variable_args) in tasks:
+            cpf = self.cpf_index[fluent_type][cpf_name]
+            exprs.append(self._ground_single_cpf(cpf, variable, variable_args).expr)
+        return exprs
+    
+    def _ground_cpfs_parallel(self, tasks):
+        
+        # split the tasks into contiguous chunks, so that the groundings of the 
+        # same CPF mostly fall into the same worker and share its memoization
+        workers = min(self.workers, len(tasks))
+        num_chunks = min(4 * workers, len(tasks))
+        size, extra = divmod(len(tasks), num_chunks)
+        chunks, start = [], 0
+        for index in range(num_chunks):
+            end = start + size + (1 if index < extra else 0)
+            chunks.append(tasks[start:end])
+            start = end
+        
+        # each worker receives the AST once when it starts
+        ctx = multiprocessing.get_context(self.context)
+        with ProcessPoolExecutor(max_workers=workers, 
+                                 mp_context=ctx,
+                                 initializer=_init_grounding_worker,
+                                 initargs=(self.AST, self.simplify, 
+                                           self._nonfluent_values)) as executor:
+            exprs = []
+            for chunk_exprs in executor.map(_ground_cpfs_in_worker, chunks):
+                exprs.extend(chunk_exprs)
+        return exprs
 
     def _ground_single_cpf(self, cpf, variable, variable_args):
         """Map arguments to actual objects."""
         args = cpf.pvar[1][1]
-        new_cpf = copy.deepcopy(cpf)
         if args is None:
-            new_cpf.expr = self._scan_expr_tree(new_cpf.expr, {})
-            return new_cpf
+            return CPF(cpf.pvar, self._scan_expr_tree(cpf.expr, {}))
         if len(args) != len(variable_args):
             raise RDDLInvalidNumberOfArgumentsError(
                 f'Ground instance <{variable}> is of arity {len(variable_args)}, '
@@ -347,14 +485,12 @@ class RDDLGrounder(BaseRDDLGrounder):
             
         # Parse cpf w.r.t cpf args and variables.
         # Fix name.
-        cpf_base_name = new_cpf.pvar[1][0]
-        cpf_name_grounding_variation = [[args_dic[arg] for arg in new_cpf.pvar[1][1]]]  # must be a nested list for func call
+        cpf_base_name = cpf.pvar[1][0]
+        cpf_name_grounding_variation = [[args_dic[arg] for arg in args]]  # must be a nested list for func call
         new_name = self._generate_grounded_names(
             cpf_base_name, cpf_name_grounding_variation)
         new_pvar = ('pvar_expr', (new_name, None))
-        new_cpf.pvar = new_pvar
-        new_cpf.expr = self._scan_expr_tree(new_cpf.expr, args_dic)
-        return new_cpf
+        return CPF(new_pvar, self._scan_expr_tree(cpf.expr, args_dic))
 
     def do_aggregate_expression_grounding(self, original_dict, new_variables_list,
                                           instances_list, operation_string,
@@ -370,17 +506,29 @@ class RDDLGrounder(BaseRDDLGrounder):
 
         new_children = []
         for instance in instances_list:
-            updated_dict = copy.deepcopy(original_dict)
+            updated_dict = dict(original_dict)
             updated_dict.update(zip(new_variables_list, instance))
             new_children.append(self._scan_expr_tree(expression, updated_dict))
         if operation_string in ('min', 'max'):
-            new_expr = new_children[0]
-            for expr in new_children[1:]:
-                new_expr = Expression(('func', (operation_string, (new_expr, expr))))
+            new_expr = self._balanced_func_tree(operation_string, new_children)
         else:
-            new_expr = Expression((operation_string, tuple(new_children)))
+            new_expr = self._make_node(operation_string, new_children)
         return new_expr
 
+    @staticmethod
+    def _balanced_func_tree(operation_string, children):
+        """Folds the children with a binary function (e.g. min or max) into a 
+        balanced tree of logarithmic depth, by pairing adjacent subtrees."""
+        while len(children) > 1:
+            paired = [
+                Expression(('func', (operation_string, (children[i], children[i + 1]))))
+                for i in range(0, len(children) - 1, 2)
+            ]
+            if len(children) % 2 == 1:
+                paired.append(children[-1])
+            children = paired
+        return children[0]
+
     def _scan_expr_tree_pvar(self, expr: Expression, dic) -> Expression:
         """Ground out a pvar expression."""
         if expr.args[1] is None:
@@ -392,7 +540,7 @@ class RDDLGrounder(BaseRDDLGrounder):
                     'a pvariable cannot currently be grounded: '
                     'grounder only supports a limited subset of '
                     'RDDL grammar at this stage.')
-            pass
+            expr = self._grounded_pvar(expr.args[0])
         elif expr.args[1]:
             variation_list = []
             for arg in expr.args[1]:
@@ -414,7 +562,7 @@ class RDDLGrounder(BaseRDDLGrounder):
                     variation_list.append(dic[arg])
             variation_list = [variation_list]
             new_name = self._generate_grounded_names(expr.args[0], variation_list)[0]
-            expr = Expression(('pvar_expr', (new_name, None)))            
+            expr = self._grounded_pvar(new_name)
         else:
             raise RDDLInvalidExpressionError(f'Malformed expression <{expr}>.')        
         return expr
@@ -423,7 +571,7 @@ class RDDLGrounder(BaseRDDLGrounder):
         new_children = []
         for child in expr.args:
             new_children.append(self._scan_expr_tree(child, dic))
-        return Expression((expr.etype[1], tuple(new_children)))
+        return self._make_node(expr.etype[1], new_children)
 
     def _scan_expr_tree_control(self, expr, dic):
         if expr.etype[1] != 'if':
@@ -438,7 +586,7 @@ class RDDLGrounder(BaseRDDLGrounder):
         ]
         # TODO: add default case when no "else". 
         # For now, we are safe, as else is expected in rddl
-        return Expression(('if', tuple(children_list)))
+        return self._make_node('if', children_list)
 
     def _scan_expr_tree_func(self, expr, dic):
         new_children = []
@@ -495,10 +643,10 @@ class RDDLGrounder(BaseRDDLGrounder):
                     num_instances = len(instance_tuples)  # Needed if this is an "Avg" operation.
                     # Then the 'expr' becomes lhs argument and
                     # we add a "\ |set_size|" operation.
-                    children_list = [expr, Expression(('number', num_instances))]
+                    children_list = [expr, self._constant_node('number', num_instances)]
                     # Note "expr" would have been an aggregate sum already,
                     # the "aggreg_recursive_operation_string" is set for that.
-                    expr = Expression(('/', tuple(children_list)))
+                    expr = self._make_node('/', children_list)
             return expr
         else:
             raise RDDLNotImplementedError(
@@ -507,11 +655,24 @@ class RDDLGrounder(BaseRDDLGrounder):
 
     def _scan_expr_tree(self, expr: Expression, dic) -> Expression:
         """Main dispatch method for recursively grounding the expression tree."""
-        scan_expr_tree_noop = lambda expr, _: expr
+        if isinstance(expr, tuple):
+            return expr
+        
+        # reuse the grounding of the same subexpression for the same objects
+        key = self._memo_key(expr, dic)
+        if key is not None:
+            grounded = self._grounded_subtrees.get(key, None)
+            if grounded is not None:
+                return grounded
+        grounded = self._scan_expr_tree_uncached(expr, dic)
+        if key is not None:
+            self._grounded_subtrees[key] = grounded
+        return grounded
+    
+    def _scan_expr_tree_uncached(self, expr, dic):
         dispatch_dict = {
-            'noop': scan_expr_tree_noop,
             'pvar': self._scan_expr_tree_pvar,
-            'constant': scan_expr_tree_noop,
+            'constant': self._scan_expr_tree_constant,
             'arithmetic': self._scan_expr_tree_abr,
             'boolean': self._scan_expr_tree_abr,
             'relational': self._scan_expr_tree_abr,
@@ -521,10 +682,7 @@ class RDDLGrounder(BaseRDDLGrounder):
             'func': self._scan_expr_tree_func,
             'randomvar': self._scan_expr_tree_func
         }
-        if isinstance(expr, tuple):
-            expression_type = 'noop'
-        else:
-            expression_type = expr.etype[0]
+        expression_type = expr.etype[0]
         if expression_type in dispatch_dict.keys():
             return dispatch_dict[expression_type](expr, dic)
         else:
@@ -538,7 +696,298 @@ class RDDLGrounder(BaseRDDLGrounder):
                 new_children.append(self._scan_expr_tree(child, dic))
             # If we reached here the expression is either a +,*, or comparator (>,<),
             # or aggregator (sum, product).
-            return Expression((expr.etype[1], tuple(new_children)))
+            return self._make_node(expr.etype[1], new_children)
+    
+    # ===========================================================================
+    # memoization of grounded subexpressions
+    # ===========================================================================
+    
+    def _analyze_subtree(self, expr):
+        """Returns the free variables of expr, and whether it is stochastic."""
+        info = self._subtree_info.get(id(expr), None)
+        if info is not None:
+            return info[1:]
+        
+        free, stochastic = set(), expr.etype[0] in {'randomvar', 'randomvector'}
+        if expr.etype[0] == 'pvar':
+            name, params = expr.args
+            if params is None:
+                params = [name]
+            for param in params:
+                if isinstance(param, Expression):
+                    param_free, param_stochastic = self._analyze_subtree(param)
+                    free.update(param_free)
+                    stochastic = stochastic or param_stochastic
+                elif RDDLGroundedModel.is_free_object(param):
+                    free.add(param)
+        elif expr.etype[0] != 'constant':
+            bound = set()
+            for arg in expr.args:
+                if isinstance(arg, Expression):
+                    arg_free, arg_stochastic = self._analyze_subtree(arg)
+                    free.update(arg_free)
+                    stochastic = stochastic or arg_stochastic
+                elif isinstance(arg, tuple) and arg and arg[0] == 'typed_var':
+                    bound.add(arg[1][0])
+            free.difference_update(bound)
+        free = tuple(sorted(free))
+        
+        # keep a reference to expr so that its id is not reused while grounding
+        self._subtree_info[id(expr)] = (expr, free, stochastic)
+        return free, stochastic
+    
+    def _memo_key(self, expr, dic):
+        free, stochastic = self._analyze_subtree(expr)
+        if stochastic:
+            return None
+        return (id(expr),) + tuple(dic.get(var, None) for var in free)
+    
+    def _pvar_node(self, name):
+        node = self._pvar_nodes.get(name, None)
+        if node is None:
+            node = self._pvar_nodes[name] = Expression(('pvar_expr', (name, None)))
+        return node
+    
+    def _constant_node(self, kind, value):
+        key = (kind, type(value), value)
+        node = self._constant_nodes.get(key, None)
+        if node is None:
+            node = self._constant_nodes[key] = Expression((kind, value))
+        return node
+    
+    def _scan_expr_tree_constant(self, expr, dic):
+        # the grounded model must not share expressions with the lifted one
+        return self._constant_node(expr[0], expr[1])
+    
+    def _clear_memo(self):
+        self._subtree_info.clear()
+        self._grounded_subtrees.clear()
+        self._pvar_nodes.clear()
+        self._constant_nodes.clear()
+        self._node_kinds.clear()
+    
+    # ===========================================================================
+    # simplification of grounded expressions
+    # ===========================================================================
+    
+    def _extract_non_fluent_values(self):
+        casts = {'bool': bool, 'int': int, 'real': float}
+        self._nonfluent_values = {}
+        for (name, value) in self.nonfluents.items():
+            cast = casts.get(self.variable_ranges[name], None)
+            if cast is not None and isinstance(value, (bool, int, float)):
+                self._nonfluent_values[name] = cast(value)
+    
+    def _grounded_pvar(self, name):
+        if self.simplify:
+            value = self._nonfluent_values.get(name, None)
+            if value is not None:
+                return self._constant_of(value)
+        return self._pvar_node(name)
+    
+    def _constant_of(self, value):
+        if isinstance(value, np.generic):
+            value = value.item()
+        kind = 'boolean' if isinstance(value, bool) else 'number'
+        return self._constant_node(kind, value)
+    
+    @staticmethod
+    def _constant_value(expr):
+        if isinstance(expr, Expression) and expr.is_constant_expression():
+            value = expr.value
+            if isinstance(value, (bool, int, float)):
+                return value
+        return _NOT_CONSTANT
+    
+    def _make_node(self, op, children):
+        if self.simplify:
+            values = [self._constant_value(child) for child in children]
+            if op in ('^', '&', '|'):
+                return self._simplify_and_or(op, children, values)
+            elif op == '+':
+                return self._simplify_sum(op, children, values)
+            elif op == '*':
+                return self._simplify_product(op, children, values)
+            elif op == 'if':
+                
+                # the simulator returns the value of the selected branch as is,
+                # so pruning does not change the type of the result
+                condition = values[0]
+                if isinstance(condition, bool):
+                    return children[1] if condition else children[2]
+            elif all(value is not _NOT_CONSTANT for value in values):
+                folded = self._fold_constants(op, values)
+                if folded is not None:
+                    return folded
+        return Expression((op, tuple(children)))
+    
+    def _fold_constants(self, op, values):
+        n = len(values)
+        try:
+            with np.errstate(all='raise'):
+                if op in FOLD_ARITHMETIC_OPS:
+                    values = [1 * value for value in values]
+                    if n == 1 and op == '-':
+                        result = -1 * values[0]
+                    elif n == 2 or (n > 2 and op in ('+', '*')):
+                        result = reduce(FOLD_ARITHMETIC_OPS[op], values)
+                    else:
+                        return None
+                elif op in FOLD_RELATIONAL_OPS and n == 2:
+                    result = FOLD_RELATIONAL_OPS[op](1 * values[0], 1 * values[1])
+                elif op in FOLD_LOGICAL_OPS \
+                and all(isinstance(value, bool) for value in values):
+                    if n == 1 and op == '~':
+                        result = np.logical_not(values[0])
+                    elif n == 2 or (n > 2 and op in ('^', '&', '|')):
+                        result = reduce(FOLD_LOGICAL_OPS[op], values)
+                    else:
+                        return None
+                else:
+                    return None
+        except (ArithmeticError, TypeError, ValueError):
+            return None
+        
+        # errors such as division by zero are left to the simulator to report
+        result = np.asarray(result).item()
+        if isinstance(result, float) and not math.isfinite(result):
+            return None
+        return self._constant_of(result)
+    
+    def _simplify_and_or(self, op, children, values):
+        
+        # a True operand of | or a False operand of ^ decides the result, 
+        # and all other constant operands can be dropped
+        decisive = (op == '|')
+        remaining = []
+        for (child, value) in zip(children, values):
+            if isinstance(value, bool):
+                if value == decisive:
+                    return self._constant_of(decisive)
+            else:
+                remaining.append(child)
+        if not remaining:
+            return self._constant_of(not decisive)
+        elif len(remaining) == 1:
+            return remaining[0]
+        return Expression((op, tuple(remaining)))
+    
+    def _simplify_sum(self, op, children, values):
+        if all(value is not _NOT_CONSTANT for value in values):
+            folded = self._fold_constants(op, values)
+            if folded is not None:
+                return folded
+        
+        # constants are not merged, since that would change rounding
+        remaining = [child for (child, value) in zip(children, values) 
+                     if value is _NOT_CONSTANT or value != 0]
+        if not remaining:
+            return self._constant_of(0)
+        remaining = self._keep_result_kind(children, values, remaining, 0)
+        if len(remaining) == 1 and len(children) > 1:
+            return remaining[0]
+        return Expression((op, tuple(remaining)))
+    
+    def _simplify_product(self, op, children, values):
+        if all(value is not _NOT_CONSTANT for value in values):
+            folded = self._fold_constants(op, values)
+            if folded is not None:
+                return folded
+        
+        # as in the simulator, products with a zero factor are zero, which is
+        # cast to the type of the product when that is known
+        kind = self._arithmetic_kind(children)
+        if kind is not None:
+            for value in values:
+                if value is not _NOT_CONSTANT and value == 0:
+                    return self._constant_of(0.0 if kind == _KIND_REAL else 0)
+        remaining = [child for (child, value) in zip(children, values) 
+                     if value is _NOT_CONSTANT or value != 1]
+        if not remaining:
+            return self._constant_of(1)
+        remaining = self._keep_result_kind(children, values, remaining, 1)
+        if len(remaining) == 1 and len(children) > 1:
+            return remaining[0]
+        return Expression((op, tuple(remaining)))
+    
+    def _keep_result_kind(self, children, values, remaining, neutral):
+        
+        # if dropping the neutral constants of a sum or product could change 
+        # the type of the result, the widest of them is kept as an operand
+        if len(remaining) == len(children):
+            return remaining
+        kind = self._arithmetic_kind(children)
+        if len(remaining) == 1:
+            new_kind = self._kind_of(remaining[0])
+        else:
+            new_kind = self._arithmetic_kind(remaining)
+        if kind is not None and new_kind == kind:
+            return remaining
+        dropped = [value for value in values 
+                   if value is not _NOT_CONSTANT and value == neutral]
+        widest = max(dropped, key=self._constant_kind)
+        return remaining + [self._constant_of(widest)]
+    
+    # ===========================================================================
+    # types of grounded expressions
+    # ===========================================================================
+    
+    def _arithmetic_kind(self, children):
+        
+        # the simulator multiplies operands of arithmetic by 1, so bools are int
+        kinds = [self._kind_of(child) for child in children]
+        if None in kinds:
+            return None
+        return max([_KIND_INT] + kinds)
+    
+    def _kind_of(self, expr):
+        """Returns the type of the values of a grounded expression, or None if
+        it cannot be determined (e.g. for enum-valued expressions)."""
+        if not isinstance(expr, Expression):
+            return None
+        info = self._node_kinds.get(id(expr), None)
+        if info is not None:
+            return info[1]
+        kind = self._kind_of_uncached(expr)
+        
+        # keep a reference to expr so that its id is not reused while grounding
+        self._node_kinds[id(expr)] = (expr, kind)
+        return kind
+    
+    @staticmethod
+    def _constant_kind(value):
+        if isinstance(value, bool):
+            return _KIND_BOOL
+        elif isinstance(value, int):
+            return _KIND_INT
+        elif isinstance(value, float):
+            return _KIND_REAL
+        return None
+    
+    def _kind_of_uncached(self, expr):
+        etype, op = expr.etype
+        if etype == 'constant':
+            return self._constant_kind(expr.value)
+        elif etype == 'pvar':
+            return _RANGE_KINDS.get(self.variable_ranges.get(op, None), None)
+        elif etype in ('boolean', 'relational'):
+            return _KIND_BOOL
+        elif etype == 'arithmetic':
+            if op == '/':
+                return _KIND_REAL
+            return self._arithmetic_kind(expr.args)
+        elif etype == 'func':
+            if op in _INT_FUNCS:
+                return _KIND_INT
+            elif op in _PROMOTING_FUNCS:
+                return self._arithmetic_kind(expr.args)
+            return _KIND_REAL
+        elif etype == 'control' and op == 'if':
+            _, then_expr, else_expr = expr.args
+            kind = self._kind_of(then_expr)
+            if kind == self._kind_of(else_expr):
+                return kind
+        return None
 
     def _ground_constraints(self) -> None:
         if hasattr(self.AST.domain, 'terminals'):
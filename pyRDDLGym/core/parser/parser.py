@@ -225,6 +225,7 @@ class RDDLlex(object):
         if self._lexer is None:
             self.build()
         self._lexer.input(data)
+        self._lexer.lineno = 1
 
     def token(self):
         return self._lexer.token()
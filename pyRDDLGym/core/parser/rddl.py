@@ -30,9 +30,9 @@ class RDDL(object):
     '''
 
     def __init__(self, blocks: Dict[str, Block]) -> None:
-        self.domain = blocks['domain']
-        self.non_fluents = blocks['non_fluents']
-        self.instance = blocks['instance']
+        self.domain = blocks.get('domain', None)
+        self.non_fluents = blocks.get('non_fluents', None)
+        self.instance = blocks.get('instance', None)
 
     def build(self):
         self.domain.build()
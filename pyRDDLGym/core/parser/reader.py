@@ -14,27 +14,13 @@ class RDDLReader(object):
     instance_block = r"(?s)instance.*?\{.*\}[^;]"
 
     def __init__(self, dom, inst=None):
-        with open(dom, encoding="utf-8", errors="replace") as file:
-            dom_txt = file.read()
-        dom_txt = self._remove_comments(dom_txt)
+        dom_txt = self.read(dom)
         dom_txt = dom_txt + "\n"
 
         if inst is not None:
-            with open(inst, encoding="utf-8", errors="replace") as file:
-                inst_txt = file.read()
-            inst_txt = self._remove_comments(inst_txt)
+            inst_txt = self.read(inst)
             dom_txt = dom_txt + "\n\n" + inst_txt + "\n"
 
-        # check for decoding errors
-        byte_data = dom_txt.encode("utf-8")
-        if REPLACEMENT_CHAR_BYTES in byte_data:
-            raise RDDLParseError(
-                (
-                    "UnicodeDecodeError: Invalid byte sequence encountered",
-                    "in file after removing comments.",
-                )
-            )
-
         # inspect rddl if three block are present - domain, non-fluent, instance
         m = re.search(self.domain_block, dom_txt)
         if m is None:
@@ -63,7 +49,26 @@ class RDDLReader(object):
     def rddltxt(self):
         return self.dom_txt
 
-    def _remove_comments(self, txt):
-        txt = re.sub(self.comment, "\n", txt)
-        txt = re.sub(self.comment_ws, "\n", txt)
+    @classmethod
+    def read(cls, path):
+        """Returns the contents of a single rddl file with comments removed."""
+        with open(path, encoding="utf-8", errors="replace") as file:
+            txt = file.read()
+        txt = cls._remove_comments(txt)
+
+        # check for decoding errors
+        byte_data = txt.encode("utf-8")
+        if REPLACEMENT_CHAR_BYTES in byte_data:
+            raise RDDLParseError(
+                (
+                    "UnicodeDecodeError: Invalid byte sequence encountered",
+                    "in file after removing comments.",
+                )
+            )
+        return txt
+
+    @classmethod
+    def _remove_comments(cls, txt):
+        txt = re.sub(cls.comment, "\n", txt)
+        txt = re.sub(cls.comment_ws, "\n", txt)
         return txt
@@ -1,5 +1,8 @@
+from collections import OrderedDict
+import copy
+import hashlib
 import numpy as np
-from typing import Dict, Optional, Set, Union
+from typing import Any, Dict, Iterable, Optional, Set, Tuple, Union
 
 from pyRDDLGym.core.compiler.initializer import RDDLValueInitializer
 from pyRDDLGym.core.compiler.levels import RDDLLevelAnalysis
@@ -7,6 +10,7 @@ from pyRDDLGym.core.compiler.model import RDDLPlanningModel
 from pyRDDLGym.core.compiler.tracer import RDDLObjectsTracer
 from pyRDDLGym.core.debug.exception import (
     print_stack_trace,
+    raise_warning,
     RDDLActionPreconditionNotSatisfiedError,
     RDDLInvalidActionError,
     RDDLInvalidNumberOfArgumentsError,
@@ -17,34 +21,164 @@ from pyRDDLGym.core.debug.exception import (
     RDDLValueOutOfRangeError
 )
 from pyRDDLGym.core.debug.logger import Logger
-from pyRDDLGym.core.parser.expr import Value
+from pyRDDLGym.core.parser.expr import Expression, Value
 
 Args = Dict[str, Value]
 
-        
+
+class RDDLTransitionMemo:
+    '''A least-recently-used table that maps a compact hash of the (state, action)
+    tensors to the outcome of a deterministic transition.'''
+
+    def __init__(self, max_bytes: int) -> None:
+        '''Creates a new empty transition table.
+
+        :param max_bytes: approximate memory budget of the stored transitions,
+        after which the least recently used transitions are evicted
+        '''
+        self.max_bytes = max_bytes
+        self._table = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(tensors: Iterable[Any]) -> bytes:
+        '''Returns a compact hash of the given sequence of tensors, which 
+        includes their types and shapes so that tensors with the same bytes 
+        (e.g., bool and int8, or shapes (2, 3) and (3, 2)) do not collide.'''
+        digest = hashlib.blake2b(digest_size=16)
+        for tensor in tensors:
+            tensor = np.ascontiguousarray(tensor)
+            digest.update(f'{tensor.dtype.str}{tensor.shape}'.encode())
+            digest.update(tensor.tobytes())
+        return digest.digest()
+
+    def get(self, key: bytes) -> Optional[Tuple]:
+        '''Returns the transition stored for key, or None if there is none.'''
+        entry = self._table.get(key, None)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._table.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: bytes, transition: Tuple, nbytes: int) -> None:
+        '''Stores a transition for key and evicts old transitions if required.'''
+        nbytes += len(key)
+        if nbytes > self.max_bytes:
+            return
+        old_entry = self._table.pop(key, None)
+        if old_entry is not None:
+            self._bytes -= old_entry[1]
+        self._table[key] = (transition, nbytes)
+        self._bytes += nbytes
+        while self._bytes > self.max_bytes:
+            _, (_, old_bytes) = self._table.popitem(last=False)
+            self._bytes -= old_bytes
+            self.evictions += 1
+
+    def clear(self) -> None:
+        '''Removes all stored transitions.'''
+        self._table.clear()
+        self._bytes = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._table),
+                'bytes': self._bytes}
+
+
 class RDDLSimulator:
-    
+
     def __init__(self, rddl: RDDLPlanningModel,
                  allow_synchronous_state: bool=True,
                  rng: np.random.Generator=np.random.default_rng(),
                  logger: Optional[Logger]=None,
-                 keep_tensors: bool=False) -> None:
+                 keep_tensors: bool=False,
+                 memoize: bool=False,
+                 memo_max_bytes: int=256 * 1024 * 1024,
+                 cpf_memory_budget: Optional[int]=None,
+                 prune_dead_fluents: bool=True,
+                 artifacts: Optional[Dict[str, Any]]=None) -> None:
         '''Creates a new simulator for the given RDDL model.
-        
+
         :param rddl: the RDDL model
         :param allow_synchronous_state: whether state-fluent can be synchronous
         :param rng: the random number generator
         :param logger: to log information about compilation to file
         :param keep_tensors: whether the sampler takes actions and
         returns state in numpy array form
+        :param memoize: whether to store the outcomes of transitions in a table,
+        so that CPFs are not re-evaluated when a (state, action) pair is revisited
+        (only for deterministic domains with small discrete state-action spaces)
+        :param memo_max_bytes: approximate memory budget of the transition table
+        :param cpf_memory_budget: approximate memory budget in bytes of the
+        largest intermediate tensor created while evaluating a single CPF; CPFs
+        exceeding it are evaluated in chunks along their first parameter
+        :param prune_dead_fluents: whether to skip the evaluation of interm and
+        derived fluents that are never read by the next state, observation, 
+        reward, constraints or termination conditions (set to False in order to
+        inspect their values)
+        :param artifacts: the compilation artifacts of another simulator for the
+        same model (e.g., loaded from a cache), which are reused instead of 
+        compiling them again if they were compiled with the same settings;
+        artifacts missing from the dictionary are compiled as usual
         '''
         self.rddl = rddl
         self.allow_synchronous_state = allow_synchronous_state
         self.rng = rng
         self.logger = logger
         self.keep_tensors = keep_tensors
-        
+        self.prune_dead_fluents = prune_dead_fluents
+        self._artifacts = artifacts
+
         self._compile()
+        self._artifacts = None
+        
+        # terminations and invariants evaluated together after each step, and
+        # whether step() and reset() check for terminal states
+        self._state_conditions = (
+            self._compile_state_conditions(rddl.terminations, self.terminal_names),
+            self._compile_state_conditions(rddl.invariants, self.invariant_names))
+        self.check_terminations = True
+
+        # factorizations of non-fluent matrix operands, computed once on demand
+        # and keyed on the version of the non-fluent values they were computed 
+        # from, so that copies sharing the cache never read stale factors
+        self._non_fluent_cache = {}
+        self._non_fluent_version = 0
+
+        # transition table for deterministic domains
+        self._memo = None
+        if memoize:
+            if self._is_deterministic():
+                self._memo = RDDLTransitionMemo(memo_max_bytes)
+            else:
+                raise_warning(
+                    'Transition memoization is only supported for deterministic '
+                    'domains, and will be disabled.', 'red')
+
+        # leading batch dimension of fluent tensors for batched evaluation
+        self._batch_size = None
+        self._required_cpfs = {}
+        
+        # cached action-independent computation for a state
+        self._action_partition = None
+        self._state_expr_ids = frozenset()
+        self._prepared = None
+        self._subexpr_cache = None
+
+        # chunk sizes of CPFs that are evaluated in chunks to bound memory use
+        self._chunk = None
+        self.cpf_chunks = {}
+        if cpf_memory_budget is not None:
+            self._compile_chunks(cpf_memory_budget)
         
         # basic operations
         self.ARITHMETIC_OPS = {
@@ -116,6 +250,25 @@ class RDDLSimulator:
         self.CONTROL_OPS = {'if': np.where,
                             'switch': np.select}
     
+    def clone(self, rng: Optional[Union[np.random.Generator, int]]=None) -> 'RDDLSimulator':
+        '''Returns a new simulator that shares the compiled model, initial values
+        and traced expression information with this simulator, but has its own 
+        state, random number generator and caches of computed values.
+        
+        :param rng: the random number generator or an integer seed for it
+        (defaults to a new generator with a random seed)
+        '''
+        if rng is None:
+            rng = np.random.default_rng()
+        sim = self._bind(rng)
+        sim.subs = self.init_values.copy()
+        sim.state = None
+        sim._non_fluent_cache = {}
+        sim._prepared = None
+        if self._memo is not None:
+            sim._memo = RDDLTransitionMemo(self._memo.max_bytes)
+        return sim
+    
     def seed(self, seed: int) -> None:
         '''Sets the pseudo-random RNG seed for generating random numbers.
         
@@ -123,30 +276,67 @@ class RDDLSimulator:
         '''
         self.rng = np.random.default_rng(seed)
         
-    def _compile(self):
+    def _compile_artifacts(self, artifacts):
         rddl = self.rddl
         
         # compile initial values
-        initializer = RDDLValueInitializer(rddl, logger=self.logger)
-        self.init_values = initializer.initialize()
+        self.init_values = artifacts.get('init_values', None)
+        if self.init_values is None:
+            initializer = RDDLValueInitializer(rddl, logger=self.logger)
+            self.init_values = initializer.initialize()
         
         # compute dependency graph for CPFs and sort them by evaluation order
-        sorter = RDDLLevelAnalysis(rddl, 
-                                   allow_synchronous_state=self.allow_synchronous_state, 
-                                   logger=self.logger)
-        self.levels = sorter.compute_levels()      
+        self.levels = artifacts.get('levels', None)
+        self.dead_cpfs = artifacts.get('dead_cpfs', None)
+        if self.levels is None or self.dead_cpfs is None:
+            sorter = RDDLLevelAnalysis(
+                rddl, allow_synchronous_state=self.allow_synchronous_state, 
+                logger=self.logger)
+            self.levels = sorter.compute_levels()
+            self.dead_cpfs = []
+            if self.prune_dead_fluents:
+                self.dead_cpfs = sorter.compute_dead_cpfs()
+                
+        # trace expressions to cache information to be used later
+        self.traced = artifacts.get('traced', None)
+        if self.traced is None:
+            tracer = RDDLObjectsTracer(rddl, logger=self.logger, cpf_levels=self.levels)
+            self.traced = tracer.trace()
+    
+    def _compile_settings(self):
+        return (self.allow_synchronous_state, self.prune_dead_fluents)
+    
+    @property
+    def artifacts(self) -> Dict[str, Any]:
+        '''Returns the results of compiling the model that can be reused by 
+        another simulator for the same model, and saved along with the model.'''
+        return {'settings': self._compile_settings(),
+                'init_values': self.init_values,
+                'levels': self.levels,
+                'dead_cpfs': self.dead_cpfs,
+                'traced': self.traced}
+    
+    def _compile(self):
+        rddl = self.rddl
+        
+        # reuse artifacts compiled with the same settings
+        artifacts = self._artifacts
+        if artifacts is None \
+        or artifacts['settings'] != self._compile_settings():
+            artifacts = {}
+        self._compile_artifacts(artifacts)
+        
+        dead_cpfs = set(self.dead_cpfs)
         self.cpfs = []  
         for cpfs in self.levels.values():
             for cpf in cpfs:
+                if cpf in dead_cpfs:
+                    continue
                 _, expr = rddl.cpfs[cpf]
                 prange = rddl.variable_ranges[cpf]
                 dtype = RDDLValueInitializer.NUMPY_TYPES.get(
                     prange, RDDLValueInitializer.INT)
                 self.cpfs.append((cpf, expr, dtype))
-                
-        # trace expressions to cache information to be used later
-        tracer = RDDLObjectsTracer(rddl, logger=self.logger, cpf_levels=self.levels)
-        self.traced = tracer.trace()
         
         # initialize all fluent and non-fluent values        
         self.subs = self.init_values.copy()
@@ -163,6 +353,140 @@ class RDDLSimulator:
         self.precond_names = [f'Precondition {i}' for i in range(len(rddl.preconditions))]
         self.terminal_names = [f'Termination {i}' for i in range(len(rddl.terminations))]        
         
+    def _compile_state_conditions(self, exprs, names):
+        
+        # conditions that depend only on non-fluents and draw no random numbers
+        # are constant until the non-fluents change, so they are evaluated once
+        rddl = self.rddl
+        conditions = []
+        for (i, expr) in enumerate(exprs):
+            constant = not self.traced.cached_is_fluent(expr) \
+                and rddl.is_deterministic_expression(expr)
+            conditions.append((expr, names[i], constant))
+        return conditions
+    
+    def _compile_chunks(self, budget):
+        rddl = self.rddl
+        for (cpf, expr, _) in self.cpfs:
+            params = rddl.variable_params[cpf]
+            if not params or not self._is_chunkable(expr):
+                continue
+            rows = rddl.object_counts(params[:1])[0]
+            peak_bytes = self._peak_tensor_size(expr) * np.dtype(np.float64).itemsize
+            chunk_size = max(1, int(budget // (peak_bytes / rows)))
+            if chunk_size < rows:
+                self.cpf_chunks[cpf] = chunk_size
+
+        if self.logger is not None:
+            chunks_info = '\n\t'.join(f'{cpf}: {size}'
+                                       for (cpf, size) in self.cpf_chunks.items())
+            self.logger.log(f'[info] computed chunk sizes of CPFs evaluated in '
+                            f'chunks (memory budget = {budget} bytes):\n'
+                            f'\t{chunks_info}\n')
+
+    @staticmethod
+    def _sub_expressions(args):
+        for arg in args:
+            if isinstance(arg, Expression):
+                yield arg
+            elif isinstance(arg, (tuple, list)):
+                yield from RDDLSimulator._sub_expressions(arg)
+
+    def _is_chunkable(self, expr):
+
+        # only operations that act independently on each element of the leading
+        # axis can be evaluated in chunks, and random sampling is excluded since
+        # chunking it would not consume the random stream in the same order
+        etype, op = expr.etype
+        if etype == 'constant':
+            return True
+        elif etype == 'pvar':
+            _, args = expr.args
+            return args is None or not any(isinstance(arg, Expression)
+                                           for arg in args)
+        elif etype == 'randomvar':
+            if op not in {'KronDelta', 'DiracDelta'}:
+                return False
+        elif etype not in {'arithmetic', 'relational', 'boolean', 'aggregation',
+                           'func', 'control'}:
+            return False
+        return all(map(self._is_chunkable,
+                       RDDLSimulator._sub_expressions(expr.args)))
+
+    def _peak_tensor_size(self, expr):
+        objects = self.traced.cached_objects_in_scope(expr)
+        size = int(np.prod(self.rddl.object_counts(
+            [ptype for (_, ptype) in objects])))
+        if expr.etype[0] in {'constant', 'pvar'}:
+            return size
+        for arg in RDDLSimulator._sub_expressions(expr.args):
+            size = max(size, self._peak_tensor_size(arg))
+        return size
+
+    def _is_deterministic(self):
+        rddl = self.rddl
+        for (_, expr, _) in self.cpfs:
+            if not rddl.is_deterministic_expression(expr):
+                return False
+        return rddl.is_deterministic_expression(rddl.reward) \
+            and rddl.is_deterministic_expression(rddl.terminations)
+
+    def invalidate_non_fluent_cache(self) -> None:
+        '''Clears all cached factorizations (e.g., Cholesky factors, inverses,
+        determinants) of non-fluent matrix operands and the values of state 
+        conditions that depend only on non-fluents, as well as memoized
+        transitions and prepared states. Must be called whenever the values of 
+        non-fluents are modified after the simulator is created.
+        '''
+        self._non_fluent_version += 1
+        self._non_fluent_cache.clear()
+        if self._memo is not None:
+            self._memo.clear()
+        self._prepared = None
+    
+    def _cast_init_values(self, values, valid_type):
+        rddl = self.rddl
+        initializer = RDDLValueInitializer(rddl)
+        
+        # initial values may be shared with clones, so they are copied on write
+        init_values = self.init_values.copy()
+        for (var, value) in values.items():
+            if rddl.variable_types.get(var, None) != valid_type:
+                raise RDDLUndefinedVariableError(
+                    f'<{var}> is not a valid {valid_type}.')
+            init_values[var] = initializer.cast(var, value)
+        self.init_values = init_values
+    
+    def set_non_fluents(self, values: Args) -> None:
+        '''Replaces the values of the given non-fluents, without compiling the 
+        model again. The new values take effect immediately.
+        
+        :param values: a dict mapping lifted non-fluents to their new value 
+        tensors, which must have the same shapes and types as in the instance
+        '''
+        self._cast_init_values(values, 'non-fluent')
+        for var in values:
+            self.subs[var] = self.init_values[var]
+        self.invalidate_non_fluent_cache()
+    
+    def set_initial_state(self, values: Args) -> None:
+        '''Replaces the initial values of the given state-fluents, without 
+        compiling the model again. The new values take effect on the next reset.
+        
+        :param values: a dict mapping lifted state-fluents to their new initial
+        value tensors, which must have the same shapes and types as in the 
+        instance
+        '''
+        self._cast_init_values(values, 'state-fluent')
+
+    @property
+    def memo_stats(self) -> Optional[Dict[str, int]]:
+        '''Returns the hit/miss statistics of the transition table, or None if
+        transitions are not memoized.'''
+        if self._memo is None:
+            return None
+        return self._memo.stats
+
     @property
     def states(self) -> Args:
         return self.state.copy()
@@ -344,6 +668,33 @@ class RDDLSimulator:
                 return False
         return True
     
+    def _check_state_condition(self, expr, loc, constant):
+        if constant:
+            key = (expr.id, 'condition', self._non_fluent_version)
+            sample = self._non_fluent_cache.get(key, None)
+            if sample is not None:
+                return sample
+        sample = self._sample(expr, self.subs)
+        RDDLSimulator._check_type(sample, bool, loc, expr)
+        sample = bool(sample)
+        if constant:
+            self._non_fluent_cache[key] = sample
+        return sample
+    
+    def check_state_conditions(self) -> Tuple[bool, bool]:
+        '''Returns whether the state invariants are satisfied and whether a 
+        terminal state has been reached, with the same results and random draws
+        as check_terminal_states() followed by check_state_invariants(silent=True).
+        Both are evaluated in one pass over the compiled conditions, in which 
+        the conditions that depend only on non-fluents are evaluated once and
+        reused until the non-fluents change.'''
+        terminations, invariants = self._state_conditions
+        terminated = any(self._check_state_condition(*condition)
+                         for condition in terminations)
+        satisfied = all(self._check_state_condition(*condition)
+                        for condition in invariants)
+        return satisfied, terminated
+    
     def check_terminal_states(self) -> bool:
         '''Return True if a terminal state has been reached.'''
         for (i, terminal) in enumerate(self.rddl.terminations):
@@ -383,7 +734,7 @@ class RDDLSimulator:
         else:
             obs = self.state
         
-        done = self.check_terminal_states()
+        done = self.check_terminations and self.check_terminal_states()
         return obs, done
     
     def step(self, actions: Args) -> Args:
@@ -396,16 +747,30 @@ class RDDLSimulator:
         actions = self._process_actions(actions)
         subs = self.subs
         subs.update(actions)
-        
-        # evaluate CPFs in topological order
-        for (cpf, expr, dtype) in self.cpfs:
-            sample = self._sample(expr, subs)
-            RDDLSimulator._check_type(sample, dtype, cpf, expr)
-            subs[cpf] = sample
-        
-        # evaluate reward
-        reward = self.sample_reward()
-        
+
+        # a revisited (state, action) pair can reuse the memoized transition
+        memo = self._memo
+        transition = None
+        if memo is not None:
+            memo_key = memo.key(
+                [subs[var] for var in rddl.state_fluents] +
+                [subs[var] for var in self.noop_actions])
+            transition = memo.get(memo_key)
+
+        if transition is None:
+
+            # evaluate CPFs in topological order
+            for (cpf, expr, dtype) in self.cpfs:
+                sample = self._sample_cpf(cpf, expr, subs)
+                RDDLSimulator._check_type(sample, dtype, cpf, expr)
+                subs[cpf] = sample
+
+            # evaluate reward
+            reward = self.sample_reward()
+        else:
+            cpf_values, reward, done = transition
+            subs.update(cpf_values)
+
         # update state
         self.state = {}
         for (state, next_state) in rddl.next_state.items():
@@ -425,15 +790,615 @@ class RDDLSimulator:
                     obs.update(rddl.ground_var_with_values(var, subs[var]))
         else:
             obs = self.state
-        
-        done = self.check_terminal_states()        
+
+        # the memoized terminal flag is None if it was not checked
+        if not self.check_terminations:
+            done = False
+            if transition is None and memo is not None:
+                self._memoize(memo, memo_key, reward, None)
+        elif transition is None or done is None:
+            done = self.check_terminal_states()
+            if memo is not None:
+                self._memoize(memo, memo_key, reward, done)
         return obs, reward, done
+
+    # ===========================================================================
+    # functional interface
+    # ===========================================================================
+    
+    def _bind(self, rng: Union[np.random.Generator, int]) -> 'RDDLSimulator':
+        '''Returns a shallow copy of the simulator that shares all compiled 
+        structures with this simulator, but samples from the given generator.'''
+        if not isinstance(rng, np.random.Generator):
+            rng = np.random.default_rng(rng)
+        sim = copy.copy(self)
+        sim.rng = rng
+        sim._chunk = None
+        sim._batch_size = None
+        sim._subexpr_cache = None
+        return sim
+    
+    def transition(self, state: Args, actions: Args, 
+                   rng: Union[np.random.Generator, int]) -> Tuple[Args, float, bool, Args]:
+        '''Samples the next state from the CPF expressions, starting from the 
+        given state and actions, without modifying the simulator. Returns a 
+        tuple of the next state, the reward, whether the next state is terminal,
+        and the observation (which is the next state for a fully observed domain).
+        
+        The inputs are not copied or modified, and the values of the returned 
+        dicts may share memory with them. This function can be called from
+        several threads at once, as long as each thread uses its own rng.
+        
+        :param state: a dict mapping each lifted state-fluent to its value tensor
+        :param actions: a dict mapping lifted action-fluents to their value 
+        tensors, where action-fluents that are not specified take default values
+        :param rng: the random number generator, or an integer seed for it
+        '''
+        sim = self._bind(rng)
+        subs = sim.subs = self.init_values.copy()
+        self._update_state(subs, state)
+        self._update_actions(subs, actions)
+        return sim._advance(self.cpfs)
+    
+    def _update_state(self, subs, state):
+        rddl = self.rddl
+        for (var, value) in state.items():
+            if var not in rddl.state_fluents:
+                raise RDDLUndefinedVariableError(
+                    f'<{var}> is not a valid state-fluent, '
+                    f'must be one of {set(rddl.state_fluents)}.')
+            subs[var] = value
+    
+    def _update_actions(self, subs, actions):
+        for (var, value) in actions.items():
+            if var not in self.noop_actions:
+                raise RDDLInvalidActionError(
+                    f'<{var}> is not a valid action-fluent, '
+                    f'must be one of {set(self.noop_actions.keys())}.')
+            subs[var] = value
+    
+    def _advance(self, cpfs):
+        rddl = self.rddl
+        subs = self.subs
+        
+        # evaluate CPFs in topological order and the reward
+        for (cpf, expr, dtype) in cpfs:
+            sample = self._sample_cpf(cpf, expr, subs)
+            RDDLSimulator._check_type(sample, dtype, cpf, expr)
+            subs[cpf] = sample
+        reward = self.sample_reward()
+        
+        # advance to the next state
+        next_state = {}
+        for (var, next_var) in rddl.next_state.items():
+            subs[var] = next_state[var] = subs[next_var]
+        if self._pomdp:
+            obs = {var: subs[var] for var in rddl.observ_fluents}
+        else:
+            obs = next_state
+        done = self.check_terminal_states()
+        return next_state, reward, done, obs
+    
+    # ===========================================================================
+    # reuse of action-independent computation
+    # ===========================================================================
+    
+    def _compile_action_partition(self):
+        rddl = self.rddl
+        
+        # CPFs that are deterministic and do not depend on actions or random
+        # CPFs are evaluated once per state, all other CPFs once per action
+        sorter = RDDLLevelAnalysis(
+            rddl, allow_synchronous_state=self.allow_synchronous_state)
+        variables = set(rddl.action_fluents)
+        variables.update(cpf for (cpf, expr, _) in self.cpfs 
+                         if not rddl.is_deterministic_expression(expr))
+        action_cpfs = sorter.compute_dependent_cpfs(variables)
+        state_cpfs, other_cpfs = [], []
+        for (cpf, expr, dtype) in self.cpfs:
+            if cpf not in action_cpfs and cpf not in variables:
+                state_cpfs.append((cpf, expr, dtype))
+            else:
+                other_cpfs.append((cpf, expr, dtype))
+        
+        # largest deterministic subexpressions of the remaining CPFs and reward
+        # that read no action-fluent or CPF evaluated once per action
+        variables = set(rddl.action_fluents)
+        variables.update(cpf for (cpf, _, _) in other_cpfs)
+        state_exprs = []
+        
+        def _collect(expr):
+            if expr.is_constant_expression():
+                return
+            elif not expr.is_pvariable_expression() \
+            and not RDDLSimulator._reads_any(expr, variables) \
+            and rddl.is_deterministic_expression(expr):
+                state_exprs.append(expr)
+            else:
+                for arg in RDDLSimulator._sub_expressions(expr.args):
+                    _collect(arg)
+                    
+        for (_, expr, _) in other_cpfs:
+            _collect(expr)
+        _collect(rddl.reward)
+        
+        self._action_partition = (state_cpfs, other_cpfs, state_exprs)
+        self._state_expr_ids = frozenset(expr.id for expr in state_exprs)
+        
+        # log the partition to file
+        if self.logger is not None:
+            state_info = ', '.join(cpf for (cpf, _, _) in state_cpfs)
+            other_info = ', '.join(cpf for (cpf, _, _) in other_cpfs)
+            self.logger.log(f'[info] computed action-independent computation:\n'
+                            f'\tCPFs evaluated once per state: {{{state_info}}}\n'
+                            f'\tCPFs evaluated once per action: {{{other_info}}}\n'
+                            f'\taction-independent subexpressions: '
+                            f'{len(state_exprs)}\n')
+    
+    @staticmethod
+    def _reads_any(expr, variables):
+        if expr.is_constant_expression():
+            return False
+        elif expr.is_pvariable_expression():
+            var, _ = expr.args
+            if var in variables:
+                return True
+        return any(RDDLSimulator._reads_any(arg, variables)
+                   for arg in RDDLSimulator._sub_expressions(expr.args))
+        
+    def prepare_state(self, state: Args) -> None:
+        '''Evaluates the CPFs that do not depend on the actions, and prepares 
+        a cache of the other parts of the CPFs and reward that do not depend on
+        the actions, so that subsequent calls to step_from_prepared() from this
+        state only evaluate the parts that depend on the actions. Each of these
+        parts is evaluated and cached the first time it is needed by a call to
+        step_from_prepared(). The state of the simulator is not modified.
+        
+        :param state: a dict mapping lifted state-fluents to their value tensors,
+        where state-fluents that are not specified take the initial values in
+        the instance
+        '''
+        if self._action_partition is None:
+            self._compile_action_partition()
+        state_cpfs, _, state_exprs = self._action_partition
+        
+        subs = self.init_values.copy()
+        self._update_state(subs, state)
+        for (cpf, expr, dtype) in state_cpfs:
+            sample = self._sample_cpf(cpf, expr, subs)
+            RDDLSimulator._check_type(sample, dtype, cpf, expr)
+            subs[cpf] = sample
+        self._prepared = (subs, {})
+    
+    def step_from_prepared(self, actions: Args, 
+                           rng: Optional[Union[np.random.Generator, int]]=None) -> Tuple[Args, float, bool, Args]:
+        '''Samples the next state from the state passed to the last call of 
+        prepare_state() and the given actions, evaluating only the parts of the
+        CPFs and reward that depend on the actions. Returns the same tuple as 
+        transition(), and does not modify the simulator.
+        
+        :param actions: a dict mapping lifted action-fluents to their value 
+        tensors, where action-fluents that are not specified take default values
+        :param rng: the random number generator or an integer seed for it
+        (defaults to the generator of the simulator)
+        '''
+        if self._prepared is None:
+            raise RuntimeError(
+                'prepare_state() must be called before step_from_prepared().')
+        _, other_cpfs, _ = self._action_partition
+        subs, cache = self._prepared
+        
+        if rng is None:
+            rng = self.rng
+        sim = self._bind(rng)
+        sim.cpf_chunks = {}
+        sim._subexpr_cache = cache
+        sim.subs = subs.copy()
+        self._update_actions(sim.subs, actions)
+        return sim._advance(other_cpfs)
+    
+    # ===========================================================================
+    # batched interface
+    # ===========================================================================
+    
+    def _bind_batch(self, rng, batch_size: int) -> 'RDDLSimulator':
+        sim = self._bind(rng)
+        sim._batch_size = batch_size
+        sim.subs = {}
+        for (var, value) in self.init_values.items():
+            if self.rddl.variable_types[var] != 'non-fluent':
+                value = np.broadcast_to(value, (batch_size,) + np.shape(value))
+            sim.subs[var] = value
+        return sim
+    
+    def _update_batch(self, subs, values, valid, batch_size, msg):
+        for (var, value) in values.items():
+            if var not in valid:
+                raise RDDLUndefinedVariableError(
+                    f'<{var}> is not a valid {msg}, '
+                    f'must be one of {set(valid)}.')
+            shape = (batch_size,) + np.shape(self.init_values[var])
+            if np.shape(value) != shape:
+                raise RDDLValueOutOfRangeError(
+                    f'Value array for {msg} <{var}> must be of shape {shape}, '
+                    f'got array of shape {np.shape(value)}.')
+            subs[var] = value
+    
+    def _bind_batch_inputs(self, states, actions, rng):
+        inputs = list(states.items()) + list(actions.items())
+        if not inputs:
+            raise RDDLValueOutOfRangeError(
+                'At least one state-fluent or action-fluent value array must '
+                'be provided to determine the batch size.')
+        var, value = inputs[0]
+        if np.ndim(value) != np.ndim(self.init_values.get(var, 0)) + 1:
+            raise RDDLValueOutOfRangeError(
+                f'Value array for <{var}> must have a leading batch axis, '
+                f'got array of shape {np.shape(value)}.')
+        batch_size = np.shape(value)[0]
+        
+        sim = self._bind_batch(rng, batch_size)
+        self._update_batch(sim.subs, states, self.rddl.state_fluents, 
+                           batch_size, 'state-fluent')
+        self._update_batch(sim.subs, actions, self.noop_actions, 
+                           batch_size, 'action-fluent')
+        return sim
+    
+    def _cpfs_required_by(self, name, exprs):
+        cpfs = self._required_cpfs.get(name, None)
+        if cpfs is None:
+            sorter = RDDLLevelAnalysis(
+                self.rddl, allow_synchronous_state=self.allow_synchronous_state)
+            required = sorter.compute_required_cpfs(exprs)
+            cpfs = [(cpf, expr, dtype) 
+                    for (cpf, expr, dtype) in self.cpfs if cpf in required]
+            self._required_cpfs[name] = cpfs
+        return cpfs
+    
+    def evaluate_reward_batch(self, states: Args, actions: Args, 
+                              rng: Optional[Union[np.random.Generator, int]]=None) -> np.ndarray:
+        '''Evaluates the reward for a batch of (state, action) pairs at once, 
+        and returns an array of shape (B,). Only the CPFs required by the reward
+        (e.g., interm-fluents) are evaluated. The state of the simulator is not 
+        modified, but its random number generator advances if it is used.
+        
+        :param states: a dict mapping lifted state-fluents to value arrays with
+        a leading batch axis of size B, where state-fluents that are not 
+        specified take the initial values in the instance
+        :param actions: a dict mapping lifted action-fluents to value arrays 
+        with a leading batch axis of size B, where action-fluents that are not 
+        specified take default values
+        :param rng: the random number generator or an integer seed for it
+        (defaults to the generator of the simulator)
+        '''
+        rddl = self.rddl
+        if rng is None:
+            rng = self.rng
+        sim = self._bind_batch_inputs(states, actions, rng)
+        subs = sim.subs
+        for (cpf, expr, dtype) in self._cpfs_required_by('reward', [rddl.reward]):
+            sample = sim._sample_cpf(cpf, expr, subs)
+            RDDLSimulator._check_type(sample, dtype, cpf, expr)
+            subs[cpf] = sample
+        reward = sim._sample(rddl.reward, subs)
+        return np.asarray(reward, dtype=RDDLValueInitializer.REAL)
+    
+    def check_preconditions_batch(self, states: Args, actions: Args, 
+                                  rng: Optional[Union[np.random.Generator, int]]=None) -> np.ndarray:
+        '''Evaluates the action preconditions for a batch of (state, action) 
+        pairs at once, and returns a boolean array of shape (B,) indicating 
+        whether all preconditions are satisfied. The state of the simulator is
+        not modified, but its random number generator advances if it is used.
+        
+        :param states: a dict mapping lifted state-fluents to value arrays with
+        a leading batch axis of size B, where state-fluents that are not 
+        specified take the initial values in the instance
+        :param actions: a dict mapping lifted action-fluents to value arrays 
+        with a leading batch axis of size B, where action-fluents that are not 
+        specified take default values
+        :param rng: the random number generator or an integer seed for it
+        (defaults to the generator of the simulator)
+        '''
+        if rng is None:
+            rng = self.rng
+        sim = self._bind_batch_inputs(states, actions, rng)
+        satisfied = np.ones(sim._batch_size, dtype=bool)
+        for (i, precond) in enumerate(self.rddl.preconditions):
+            sample = sim._sample(precond, sim.subs)
+            RDDLSimulator._check_type(sample, bool, self.precond_names[i], precond)
+            satisfied &= sample
+        return satisfied
+    
+    def _check_conditions_batch(self, sim, exprs, names, reduce):
+        result = np.full(sim._batch_size, reduce is np.logical_and, dtype=bool)
+        for (i, expr) in enumerate(exprs):
+            sample = sim._sample(expr, sim.subs)
+            RDDLSimulator._check_type(sample, bool, names[i], expr)
+            result = reduce(result, sample)
+        return result
+
+    def check_state_invariants_batch(self, states: Args,
+                                     rng: Optional[Union[np.random.Generator, int]]=None) -> np.ndarray:
+        '''Evaluates the state invariants for a batch of states at once, and
+        returns a boolean array of shape (B,) indicating whether all invariants
+        are satisfied. The state of the simulator is not modified, but its 
+        random number generator advances if it is used.
+
+        :param states: a dict mapping lifted state-fluents to value arrays with
+        a leading batch axis of size B, where state-fluents that are not
+        specified take the initial values in the instance
+        :param rng: the random number generator or an integer seed for it
+        (defaults to the generator of the simulator)
+        '''
+        if rng is None:
+            rng = self.rng
+        sim = self._bind_batch_inputs(states, {}, rng)
+        return self._check_conditions_batch(
+            sim, self.rddl.invariants, self.invariant_names, np.logical_and)
+
+    def step_batch(self, states: Args, actions: Args,
+                   rng: Optional[Union[np.random.Generator, int]]=None) -> Tuple[Args, np.ndarray, np.ndarray, Args]:
+        '''Samples the next states of a batch of (state, action) pairs at once.
+        Returns a tuple of the next states, the rewards of shape (B,), whether
+        each next state is terminal as an array of shape (B,), and the
+        observations (which are the next states for a fully observed domain).
+        The state of the simulator is not modified, but its random number 
+        generator advances if it is used.
+
+        :param states: a dict mapping lifted state-fluents to value arrays with
+        a leading batch axis of size B, where state-fluents that are not
+        specified take the initial values in the instance
+        :param actions: a dict mapping lifted action-fluents to value arrays
+        with a leading batch axis of size B, where action-fluents that are not
+        specified take default values
+        :param rng: the random number generator or an integer seed for it
+        (defaults to the generator of the simulator)
+        '''
+        rddl = self.rddl
+        if rng is None:
+            rng = self.rng
+        sim = self._bind_batch_inputs(states, actions, rng)
+        subs = sim.subs
+
+        # evaluate CPFs and reward of all elements of the batch at once
+        for (cpf, expr, dtype) in self.cpfs:
+            sample = sim._sample_cpf(cpf, expr, subs)
+            RDDLSimulator._check_type(sample, dtype, cpf, expr)
+            subs[cpf] = sample
+        reward = np.asarray(sim._sample(rddl.reward, subs),
+                            dtype=RDDLValueInitializer.REAL)
+        reward = np.broadcast_to(reward, (sim._batch_size,))
+
+        # advance to the next state and check termination
+        next_state = {}
+        for (var, next_var) in rddl.next_state.items():
+            subs[var] = next_state[var] = subs[next_var]
+        if self._pomdp:
+            obs = {var: subs[var] for var in rddl.observ_fluents}
+        else:
+            obs = next_state
+        done = self._check_conditions_batch(
+            sim, rddl.terminations, self.terminal_names, np.logical_or)
+        return next_state, reward, done, obs
+
+    def _count_non_default_actions(self, subs):
+        count = 0
+        for (var, default) in self.noop_actions.items():
+            non_default = np.asarray(subs[var] != default)
+            count = count + np.count_nonzero(
+                np.reshape(non_default, (non_default.shape[0], -1)), axis=1)
+        return count
+    
+    def rollout_plans(self, initial_state: Args, plans: Args,
+                      num_samples: int=1,
+                      discount: float=1.0,
+                      rng: Optional[Union[np.random.Generator, int]]=None,
+                      mask_invalid: bool=False,
+                      return_trajectories: bool=False) -> Union[np.ndarray, Tuple[np.ndarray, Dict[str, Any]]]:
+        '''Evaluates a batch of open-loop plans from a common initial state, 
+        by simulating all rollouts of all plans at once in vectorized form. 
+        Returns the cumulative discounted reward of each plan averaged over 
+        its rollouts, as an array of shape (P,). The simulator is not modified.
+        
+        :param initial_state: a dict mapping lifted state-fluents to their 
+        value tensors, where state-fluents that are not specified take the 
+        initial values in the instance
+        :param plans: a dict mapping lifted action-fluents to arrays of shape
+        (P, T, ...) holding the values of the action-fluent in each of P plans
+        at each of T decision epochs, where action-fluents that are not 
+        specified take default values
+        :param num_samples: the number of independent rollouts of each plan
+        :param discount: the discount factor applied to rewards
+        :param rng: the random number generator or an integer seed for it
+        (defaults to the generator of the simulator)
+        :param mask_invalid: whether to assign a cumulative reward of -inf to
+        rollouts whose actions violate max-nondef-actions or the action 
+        preconditions, instead of raising an exception
+        :param return_trajectories: whether to also return a dict with the 
+        state trajectories of shape (P, num_samples, T, ...), as well as the 
+        rewards and termination flags of shape (P, num_samples, T), and the 
+        cumulative rewards and validity flags of shape (P, num_samples)
+        '''
+        rddl = self.rddl
+        if rng is None:
+            rng = self.rng
+        
+        # determine the number of plans and horizon
+        shapes = {np.shape(plan)[:2] for plan in plans.values()}
+        if len(shapes) != 1:
+            raise RDDLValueOutOfRangeError(
+                f'All plans must have the same number of plans and decision '
+                f'epochs in their leading two axes, got shapes {shapes}.')
+        (num_plans, horizon), = shapes
+        batch_size = num_plans * num_samples
+        
+        # initialize the state and repeat each plan num_samples times
+        sim = self._bind_batch(rng, batch_size)
+        subs = sim.subs
+        initial_state = {var: np.broadcast_to(
+                            value, (batch_size,) + np.shape(value))
+                         for (var, value) in initial_state.items()}
+        self._update_batch(subs, initial_state, rddl.state_fluents, 
+                           batch_size, 'state-fluent')
+        plans = {var: np.repeat(plan, num_samples, axis=0)
+                 for (var, plan) in plans.items()}
+        
+        returns = np.zeros(batch_size, dtype=RDDLValueInitializer.REAL)
+        alive = np.ones(batch_size, dtype=bool)
+        valid = np.ones(batch_size, dtype=bool)
+        if return_trajectories:
+            states = {var: np.empty((batch_size, horizon) + np.shape(value),
+                                    dtype=np.asarray(value).dtype)
+                      for (var, value) in self.init_values.items()
+                      if var in rddl.state_fluents}
+            rewards = np.zeros((batch_size, horizon), 
+                               dtype=RDDLValueInitializer.REAL)
+            dones = np.zeros((batch_size, horizon), dtype=bool)
+            
+        for step in range(horizon):
+            
+            # check actions satisfy max-nondef-actions and preconditions
+            actions = {var: plan[:, step] for (var, plan) in plans.items()}
+            self._update_batch(subs, actions, self.noop_actions, 
+                               batch_size, 'action-fluent')
+            count = self._count_non_default_actions(subs)
+            satisfied = count <= rddl.max_allowed_actions
+            if not mask_invalid and not np.all(satisfied[alive]):
+                index = np.flatnonzero(alive & ~satisfied)[0]
+                raise RDDLInvalidActionError(
+                    f'Expected at most {rddl.max_allowed_actions} non-default '
+                    f'actions, got {count[index]} in plan {index // num_samples} '
+                    f'at decision epoch {step}.')
+            for (i, precond) in enumerate(rddl.preconditions):
+                sample = sim._sample(precond, subs)
+                RDDLSimulator._check_type(
+                    sample, bool, self.precond_names[i], precond)
+                sample = sim._broadcast_batch(sample, precond)
+                if not mask_invalid and not np.all(sample[alive]):
+                    index = np.flatnonzero(alive & ~sample)[0]
+                    raise RDDLActionPreconditionNotSatisfiedError(
+                        f'{self.precond_names[i]} is not satisfied in plan '
+                        f'{index // num_samples} at decision epoch {step}.\n' + 
+                        print_stack_trace(precond))
+                satisfied = satisfied & sample
+            valid &= satisfied | ~alive
+            
+            # evaluate CPFs and reward of all rollouts at once
+            for (cpf, expr, dtype) in self.cpfs:
+                sample = sim._sample_cpf(cpf, expr, subs)
+                RDDLSimulator._check_type(sample, dtype, cpf, expr)
+                subs[cpf] = sample
+            reward = sim._sample(rddl.reward, subs)
+            reward = np.where(alive, reward, 0.0)
+            returns += (discount ** step) * reward
+            
+            # advance to the next state and check termination
+            for (var, next_var) in rddl.next_state.items():
+                subs[var] = subs[next_var]
+            done = self._check_conditions_batch(
+                sim, rddl.terminations, self.terminal_names, np.logical_or)
+            
+            if return_trajectories:
+                for (var, values) in states.items():
+                    values[:, step] = subs[var]
+                rewards[:, step] = reward
+                dones[:, step] = done & alive
+            alive &= ~done
+        
+        if mask_invalid:
+            returns[~valid] = -np.inf
+        result = np.mean(np.reshape(returns, (num_plans, num_samples)), axis=1)
+        if not return_trajectories:
+            return result
+        
+        shape = (num_plans, num_samples)
+        trajectories = {
+            'state': {var: np.reshape(values, shape + values.shape[1:])
+                      for (var, values) in states.items()},
+            'reward': np.reshape(rewards, shape + (horizon,)),
+            'done': np.reshape(dones, shape + (horizon,)),
+            'return': np.reshape(returns, shape),
+            'valid': np.reshape(valid, shape)
+        }
+        return result, trajectories
+        
+    def _memoize(self, memo, key, reward, done):
+        cpf_values = {}
+        nbytes = 0
+        for (cpf, _, _) in self.cpfs:
+            value = self.subs[cpf]
+            if isinstance(value, np.ndarray):
+                value = np.array(value)
+                value.setflags(write=False)
+            cpf_values[cpf] = value
+            nbytes += np.asarray(value).nbytes
+        memo.put(key, (cpf_values, reward, done), nbytes)
         
     # ===========================================================================
     # start of sampling subroutines
     # ===========================================================================
+
+    def _sample_cpf(self, cpf, expr, subs):
+        chunk_size = self.cpf_chunks.get(cpf, None)
+        if chunk_size is None or self._batch_size is not None:
+            return self._sample(expr, subs)
+
+        # evaluate chunks of the leading axis and write them into the output
+        rows = self.rddl.object_counts(self.rddl.variable_params[cpf][:1])[0]
+        sample = None
+        try:
+            for start in range(0, rows, chunk_size):
+                chunk = slice(start, start + chunk_size)
+                self._chunk = chunk
+                sample_chunk = np.asarray(self._sample(expr, subs))
+                if sample is None:
+                    sample = np.empty((rows,) + sample_chunk.shape[1:],
+                                      dtype=sample_chunk.dtype)
+                elif not np.can_cast(sample_chunk.dtype, sample.dtype):
+                    sample = sample.astype(
+                        np.result_type(sample, sample_chunk))
+                sample[chunk] = sample_chunk
+        finally:
+            self._chunk = None
+        return sample
+    
+    def _sample_factorized(self, arg, subs, op, name):
+        
+        # fluent operands must be factorized every time they are evaluated
+        if self.traced.cached_is_fluent(arg):
+            return op(self._sample(arg, subs))
+        
+        # non-fluent operands are factorized only once and reused thereafter
+        # (for a batch, once for the first element since all are identical)
+        key = (arg.id, name, self._non_fluent_version)
+        sample = self._non_fluent_cache.get(key, None)
+        if sample is None:
+            sample = self._sample(arg, subs)
+            if self._batch_size is not None:
+                sample = sample[0]
+            sample = np.asarray(op(sample))
+            sample.setflags(write=False)
+            self._non_fluent_cache[key] = sample
+        if self._batch_size is not None:
+            sample = np.broadcast_to(sample, (self._batch_size,) + sample.shape)
+        return sample
+    
+    def _sample_cached(self, expr, subs):
+        cache = self._subexpr_cache
+        sample = cache.get(expr.id, None)
+        if sample is None:
+            
+            # the cached subexpressions are maximal, so none is nested in another
+            self._subexpr_cache = None
+            try:
+                sample = cache[expr.id] = self._sample(expr, subs)
+            finally:
+                self._subexpr_cache = cache
+        return sample
     
     def _sample(self, expr, subs):
+        if self._subexpr_cache is not None and expr.id in self._state_expr_ids:
+            return self._sample_cached(expr, subs)
         etype, _ = expr.etype
         if etype == 'constant':
             return self._sample_constant(expr, subs)
@@ -466,8 +1431,21 @@ class RDDLSimulator:
     # leaves
     # ===========================================================================
         
+    def _broadcast_batch(self, sample, expr):
+        
+        # prepend the batch dimension to values that do not depend on fluents
+        if np.ndim(sample) == len(self.traced.cached_objects_in_scope(expr)):
+            sample = np.broadcast_to(
+                sample, shape=(self._batch_size,) + np.shape(sample))
+        return sample
+    
     def _sample_constant(self, expr, _):
-        return self.traced.cached_sim_info(expr)
+        sample = self.traced.cached_sim_info(expr)
+        if self._chunk is not None and np.ndim(sample):
+            sample = sample[self._chunk]
+        if self._batch_size is not None:
+            sample = self._broadcast_batch(sample, expr)
+        return sample
     
     def _sample_pvar(self, expr, subs):
         var, args = expr.args
@@ -475,6 +1453,10 @@ class RDDLSimulator:
         # free variable (e.g., ?x) and object converted to canonical index
         is_value, cached_info = self.traced.cached_sim_info(expr)
         if is_value:
+            if self._chunk is not None and np.ndim(cached_info):
+                cached_info = cached_info[self._chunk]
+            if self._batch_size is not None:
+                cached_info = self._broadcast_batch(cached_info, expr)
             return cached_info
         
         # extract variable value
@@ -484,6 +1466,20 @@ class RDDLSimulator:
                 f'Variable <{var}> is referenced before assignment.\n' + 
                 print_stack_trace(expr))
         
+        # batched fluent tensors have an additional leading axis
+        batch_size = self._batch_size
+        if batch_size is not None:
+            if cached_info is None:
+                return self._broadcast_batch(sample, expr)
+            elif self.rddl.variable_types[var] == 'non-fluent':
+                sample = self._transform_batched(
+                    sample[np.newaxis, ...], args, cached_info, subs, 
+                    batch_size=1)
+                return np.broadcast_to(
+                    sample, shape=(batch_size,) + sample.shape[1:])
+            else:
+                return self._transform_batched(sample, args, cached_info, subs)
+        
         # lifted domain must slice and/or reshape value tensor
         if cached_info is not None:
             slices, axis, shape, op_code, op_args = cached_info
@@ -501,6 +1497,35 @@ class RDDLSimulator:
                 sample = np.einsum(sample, *op_args)
             elif op_code == RDDLObjectsTracer.NUMPY_OP_CODE.TRANSPOSE:
                 sample = np.transpose(sample, axes=op_args)
+        if self._chunk is not None and np.ndim(sample):
+            sample = sample[self._chunk]
+        return sample
+    
+    def _transform_batched(self, sample, args, cached_info, subs, batch_size=None):
+        if batch_size is None:
+            batch_size = self._batch_size
+        slices, axis, shape, op_code, op_args = cached_info
+        if slices: 
+            if op_code == RDDLObjectsTracer.NUMPY_OP_CODE.NESTED_SLICE:
+                slices = tuple(
+                    (self._sample(arg, subs) if _slice is None else _slice)
+                    for (arg, _slice) in zip(args, slices)
+                )
+                batch_index = np.arange(sample.shape[0])
+                batch_index = np.reshape(
+                    batch_index, (-1,) + (1,) * (max(map(np.ndim, slices)) - 1))
+                sample = sample[(batch_index,) + slices]
+            else:
+                sample = sample[(slice(None),) + slices]
+        if axis:
+            sample = np.expand_dims(sample, axis=tuple(i + 1 for i in axis))
+            sample = np.broadcast_to(sample, shape=(batch_size,) + shape)
+        if op_code == RDDLObjectsTracer.NUMPY_OP_CODE.EINSUM:
+            permuted, objects_range = op_args
+            sample = np.einsum(sample, [Ellipsis] + list(permuted), 
+                               [Ellipsis] + list(objects_range))
+        elif op_code == RDDLObjectsTracer.NUMPY_OP_CODE.TRANSPOSE:
+            sample = np.transpose(sample, axes=(0,) + tuple(i + 1 for i in op_args))
         return sample
     
     # ===========================================================================
@@ -539,6 +1564,8 @@ class RDDLSimulator:
         # for a grounded domain can short-circuit * and +
         elif n > 0 and not self.traced.cached_objects_in_scope(expr):
             if op == '*':
+                if self._batch_size is not None:
+                    return self._sample_product_batched(args, subs)
                 return self._sample_product_grounded(args, subs)
             elif op == '+':
                 return sum(1 * self._sample(arg, subs) for arg in args)
@@ -562,24 +1589,32 @@ class RDDLSimulator:
         sample_rhs = self._sample(rhs, subs)
         return sample_lhs * sample_rhs
     
+    def _sample_product_batched(self, args, subs):
+        prod = 1
+        for arg in args: 
+            prod = prod * self._sample(arg, subs)
+            if not np.any(prod):
+                return prod
+        return prod
+    
     def _sample_product_grounded(self, args, subs):
         prod = 1
         
-        # go through simple expressions first
+        # go through simple expressions first, deferring complex ones
+        complex_args = []
         for arg in args: 
             if arg.is_constant_expression() or arg.is_pvariable_expression():
-                sample = self._sample(arg, subs)
-                prod *= sample
+                prod *= self._sample(arg, subs)
                 if prod == 0:
                     return prod
+            else:
+                complex_args.append(arg)
         
         # go through complex expressions last
-        for arg in args: 
-            if not (arg.is_constant_expression() or arg.is_pvariable_expression()):
-                sample = self._sample(arg, subs)
-                prod *= sample
-                if prod == 0:
-                    return prod
+        for arg in complex_args: 
+            prod *= self._sample(arg, subs)
+            if prod == 0:
+                return prod
                 
         return prod
         
@@ -630,6 +1665,8 @@ class RDDLSimulator:
         # for a grounded domain, we can short-circuit ^ and |
         elif n > 0 and (op == '^' or op == '|') \
         and not self.traced.cached_objects_in_scope(expr):
+            if self._batch_size is not None:
+                return self._sample_and_or_batched(args, op, expr, subs)
             return self._sample_and_or_grounded(args, op, expr, subs)
             
         raise RDDLInvalidNumberOfArgumentsError(
@@ -658,30 +1695,42 @@ class RDDLSimulator:
         else:
             return np.logical_or(sample_lhs, sample_rhs)
     
+    def _sample_and_or_batched(self, args, op, expr, subs):
+        use_and = op == '^'
+        result = None
+        for (i, arg) in enumerate(args):
+            sample = self._sample(arg, subs)
+            RDDLSimulator._check_type(sample, bool, op, expr, arg=i + 1)
+            if result is None:
+                result = sample
+            elif use_and:
+                result = np.logical_and(result, sample)
+            else:
+                result = np.logical_or(result, sample)
+            if (use_and and not np.any(result)) or (not use_and and np.all(result)):
+                break
+        return result
+    
     def _sample_and_or_grounded(self, args, op, expr, subs): 
         use_and = op == '^'
         
-        # go through simple expressions first
+        # go through simple expressions first, deferring complex ones
+        complex_args = []
         for (i, arg) in enumerate(args):
             if arg.is_constant_expression() or arg.is_pvariable_expression():
                 sample = self._sample(arg, subs)
                 RDDLSimulator._check_type(sample, bool, op, expr, arg=i + 1)
-                sample = bool(sample)
-                if use_and and not sample:
-                    return False
-                elif not use_and and sample:
-                    return True
+                if bool(sample) != use_and:
+                    return not use_and
+            else:
+                complex_args.append((i, arg))
         
         # go through complex expressions last
-        for (i, arg) in enumerate(args):
-            if not (arg.is_constant_expression() or arg.is_pvariable_expression()):
-                sample = self._sample(arg, subs)
-                RDDLSimulator._check_type(sample, bool, op, expr, arg=i + 1)
-                sample = bool(sample)
-                if use_and and not sample:
-                    return False
-                elif not use_and and sample:
-                    return True
+        for (i, arg) in complex_args:
+            sample = self._sample(arg, subs)
+            RDDLSimulator._check_type(sample, bool, op, expr, arg=i + 1)
+            if bool(sample) != use_and:
+                return not use_and
             
         return use_and
             
@@ -702,6 +1751,9 @@ class RDDLSimulator:
         else:
             sample = 1 * sample
         _, axes = self.traced.cached_sim_info(expr)
+        if self._batch_size is not None:
+            axes = (tuple(axis + 1 for axis in axes) 
+                    if isinstance(axes, tuple) else axes + 1)
         return numpy_op(sample, axis=axes)
      
     # ===========================================================================
@@ -770,7 +1822,8 @@ class RDDLSimulator:
         
         # can short circuit if all elements of predicate tensor equal
         first_elem = bool(sample_pred.flat[0] 
-                          if self.traced.cached_objects_in_scope(expr) 
+                          if self._batch_size is not None
+                          or self.traced.cached_objects_in_scope(expr) 
                           else sample_pred)
         all_equal = np.all(sample_pred == first_elem)
         
@@ -791,7 +1844,8 @@ class RDDLSimulator:
         # can short circuit if all elements of predicate tensor equal
         cases, default = self.traced.cached_sim_info(expr)  
         first_elem = bool(sample_pred.flat[0] 
-                          if self.traced.cached_objects_in_scope(expr) 
+                          if self._batch_size is not None
+                          or self.traced.cached_objects_in_scope(expr) 
                           else sample_pred)
         all_equal = np.all(sample_pred == first_elem)
         
@@ -909,7 +1963,8 @@ class RDDLSimulator:
         pr, = args
         sample_pr = self._sample(pr, subs)
         RDDLSimulator._check_range(sample_pr, 0, 1, 'Bernoulli p', expr)
-        size = sample_pr.shape if self.traced.cached_objects_in_scope(expr) else None
+        size = sample_pr.shape if self._batch_size is not None \
+            or self.traced.cached_objects_in_scope(expr) else None
         return self.rng.uniform(size=size) <= sample_pr
     
     def _sample_normal(self, expr, subs):
@@ -1054,7 +2109,8 @@ class RDDLSimulator:
         sample_mean = self._sample(mean, subs)
         sample_scale = self._sample(scale, subs)
         RDDLSimulator._check_positive(sample_scale, True, 'Cauchy scale', expr)
-        size = sample_mean.shape if self.traced.cached_objects_in_scope(expr) else None
+        size = sample_mean.shape if self._batch_size is not None \
+            or self.traced.cached_objects_in_scope(expr) else None
         cauchy01 = self.rng.standard_cauchy(size=size)
         return sample_mean + sample_scale * cauchy01
     
@@ -1067,7 +2123,8 @@ class RDDLSimulator:
         sample_scale = self._sample(scale, subs)
         RDDLSimulator._check_positive(sample_shape, True, 'Gompertz shape', expr)
         RDDLSimulator._check_positive(sample_scale, True, 'Gompertz scale', expr)
-        size = sample_shape.shape if self.traced.cached_objects_in_scope(expr) else None
+        size = sample_shape.shape if self._batch_size is not None \
+            or self.traced.cached_objects_in_scope(expr) else None
         U = self.rng.uniform(size=size)
         return np.log(1.0 - np.log1p(-U) / sample_shape) / sample_scale
     
@@ -1089,7 +2146,8 @@ class RDDLSimulator:
         sample_b = self._sample(b, subs)
         RDDLSimulator._check_positive(sample_a, True, 'Kumaraswamy a', expr)
         RDDLSimulator._check_positive(sample_b, True, 'Kumaraswamy b', expr)
-        size = sample_a.shape if self.traced.cached_objects_in_scope(expr) else None
+        size = sample_a.shape if self._batch_size is not None \
+            or self.traced.cached_objects_in_scope(expr) else None
         U = self.rng.uniform(size=size)
         return (1.0 - U ** (1.0 / sample_b)) ** (1.0 / sample_a)
     
@@ -1152,10 +2210,9 @@ class RDDLSimulator:
         
         mean, cov = args
         sample_mean = self._sample(mean, subs)
-        sample_cov = self._sample(cov, subs)
         
         # reparameterization trick MN(m, LL') = LZ + m, where Z ~ Normal(0, 1)
-        L = np.linalg.cholesky(sample_cov)
+        L = self._sample_factorized(cov, subs, np.linalg.cholesky, 'cholesky')
         Z = self.rng.standard_normal(
             size=sample_mean.shape + (1,),
             dtype=RDDLValueInitializer.REAL)
@@ -1164,6 +2221,8 @@ class RDDLSimulator:
         # since the sampling is done in the last dimension we need to move it
         # to match the order of the CPF variables
         index, = self.traced.cached_sim_info(expr)
+        if self._batch_size is not None:
+            index += 1
         sample = np.moveaxis(sample, source=-1, destination=index)
         return sample
     
@@ -1173,20 +2232,21 @@ class RDDLSimulator:
         
         mean, cov, df = args
         sample_mean = self._sample(mean, subs)
-        sample_cov = self._sample(cov, subs)
+        L = self._sample_factorized(cov, subs, np.linalg.cholesky, 'cholesky')
         sample_df = self._sample(df, subs)
         RDDLSimulator._check_positive(sample_df, True, 'MultivariateStudent df', expr)
         
         # reparameterization trick MN(m, LL') = LZ + m, where Z ~ StudentT(0, 1)
         sample_df = sample_df[..., np.newaxis, np.newaxis]
         sample_df = np.broadcast_to(sample_df, shape=sample_mean.shape + (1,))
-        L = np.linalg.cholesky(sample_cov)
         Z = self.rng.standard_t(df=sample_df)
         sample = np.matmul(L, Z)[..., 0] + sample_mean
         
         # since the sampling is done in the last dimension we need to move it
         # to match the order of the CPF variables
         index, = self.traced.cached_sim_info(expr)
+        if self._batch_size is not None:
+            index += 1
         sample = np.moveaxis(sample, source=-1, destination=index)
         return sample
     
@@ -1205,6 +2265,8 @@ class RDDLSimulator:
         # since the sampling is done in the last dimension we need to move it
         # to match the order of the CPF variables
         index, = self.traced.cached_sim_info(expr)
+        if self._batch_size is not None:
+            index += 1
         sample = np.moveaxis(sample, source=-1, destination=index)
         return sample
     
@@ -1232,6 +2294,8 @@ class RDDLSimulator:
         # since the sampling is done in the last dimension we need to move it
         # to match the order of the CPF variables
         index, = self.traced.cached_sim_info(expr)
+        if self._batch_size is not None:
+            index += 1
         sample = np.moveaxis(sample, source=-1, destination=index)
         return sample
         
@@ -1256,28 +2320,30 @@ class RDDLSimulator:
     
     def _sample_matrix_det(self, expr, subs):
         * _, arg = expr.args
-        sample_arg = self._sample(arg, subs)
-        return np.linalg.det(sample_arg)
+        return self._sample_factorized(arg, subs, np.linalg.det, 'det')
     
     def _sample_matrix_inv(self, expr, subs, pseudo):
         _, arg = expr.args
-        sample_arg = self._sample(arg, subs)
-        op = np.linalg.pinv if pseudo else np.linalg.inv
-        sample = op(sample_arg)
+        if pseudo:
+            sample = self._sample_factorized(arg, subs, np.linalg.pinv, 'pinverse')
+        else:
+            sample = self._sample_factorized(arg, subs, np.linalg.inv, 'inverse')
         
         # matrix dimensions are last two axes, move them to the correct position
         indices = self.traced.cached_sim_info(expr)
+        if self._batch_size is not None:
+            indices = tuple(index + 1 for index in indices)
         sample = np.moveaxis(sample, source=(-2, -1), destination=indices)
         return sample        
     
     def _sample_matrix_cholesky(self, expr, subs):
         _, arg = expr.args
-        sample_arg = self._sample(arg, subs)
-        op = np.linalg.cholesky
-        sample = op(sample_arg)
+        sample = self._sample_factorized(arg, subs, np.linalg.cholesky, 'cholesky')
         
         # matrix dimensions are last two axes, move them to the correct position
         indices = self.traced.cached_sim_info(expr)
+        if self._batch_size is not None:
+            indices = tuple(index + 1 for index in indices)
         sample = np.moveaxis(sample, source=(-2, -1), destination=indices)
         return sample  
     
@@ -0,0 +1,642 @@
+from gymnasium.error import (
+    AlreadyPendingCallError,
+    ClosedEnvironmentError,
+    NoAsyncCallError
+)
+from gymnasium.vector import VectorEnv
+from gymnasium.vector.utils import batch_space
+import multiprocessing
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+import os
+import time
+import typing
+from typing import Any, Optional, Tuple, Type
+
+from pyRDDLGym.core.cache import RDDLCompilationCache
+from pyRDDLGym.core.debug.exception import (
+    RDDLActionPreconditionNotSatisfiedError,
+    RDDLInvalidActionError
+)
+from pyRDDLGym.core.env import RDDLEnv
+from pyRDDLGym.core.simulator import RDDLSimulator
+from pyRDDLGym.registration import make
+
+try:
+    from gymnasium.vector import AutoresetMode
+    _NEXT_STEP = AutoresetMode.NEXT_STEP
+except ImportError:
+    _NEXT_STEP = 'next_step'
+
+
+class RDDLBatchLayout:
+    '''Describes how the batched lifted fluent tensors of a RDDL instance map
+    to the observations and actions of a vector environment, where all values 
+    are stacked along a leading axis with one element per copy of the instance.
+    Holds no reference to the model, so it can be sent to other processes.'''
+
+    def __init__(self, env: RDDLEnv) -> None:
+        '''Creates a new layout for the given environment.
+
+        :param env: the environment whose observation and action spaces are
+        batched
+        '''
+        model = env.model
+        sampler = env.sampler
+        self.vectorized = env.vectorized
+
+        # lifted observed fluents with their tensor shapes and types
+        if sampler.is_pomdp:
+            observ_fluents = model.observ_fluents
+        else:
+            observ_fluents = model.state_fluents
+        self.observ_tensors = {}
+        for var in observ_fluents:
+            value = np.asarray(sampler.init_values[var])
+            self.observ_tensors[var] = (value.shape, value.dtype)
+        if self.vectorized:
+            self.observ_shapes = {var: env.observation_space[var].shape
+                                  for var in observ_fluents}
+        else:
+            self.observ_groundings = {var: model.variable_groundings[var]
+                                      for var in observ_fluents}
+
+        # grounded actions are located by their row-major index in the tensor
+        self.noop_actions = {var: np.asarray(value)
+                             for (var, value) in sampler.noop_actions.items()}
+        self.bool_actions = {var for (var, prange) in model.action_ranges.items()
+                             if prange == 'bool'}
+        self.action_groundings = {}
+        if not self.vectorized:
+            for var in self.noop_actions:
+                for (i, name) in enumerate(model.variable_groundings[var]):
+                    self.action_groundings[name] = (var, i)
+
+    def lifted_actions(self, actions: typing.Dict[str, Any], 
+                       num_envs: int) -> typing.Dict[str, np.ndarray]:
+        '''Converts batched actions of a vector environment into batched lifted 
+        action tensors, where unspecified grounded actions take default values.'''
+        noop_actions = self.noop_actions
+        lifted = {}
+        for (action, values) in actions.items():
+            
+            # lifted actions are reshaped and assigned directly
+            if action in noop_actions:
+                shape = (num_envs,) + noop_actions[action].shape
+                values = np.reshape(values, shape)
+                if action in self.bool_actions:
+                    values = np.asarray(values, dtype=bool)
+                lifted[action] = values
+                continue
+            
+            # grounded actions are written into a copy of the default tensor
+            var, index = self.action_groundings.get(action, (None, None))
+            if var is None:
+                raise RDDLInvalidActionError(
+                    f'<{action}> is not a valid action-fluent.')
+            tensor = lifted.get(var, None)
+            if tensor is None:
+                tensor = lifted[var] = np.repeat(
+                    noop_actions[var][np.newaxis, ...], num_envs, axis=0)
+            np.reshape(tensor, (num_envs, -1))[:, index] = values
+        return lifted
+    
+    def observation(self, values: typing.Dict[str, np.ndarray], 
+                    num_envs: int) -> typing.Dict[str, np.ndarray]:
+        '''Converts batched lifted tensors of the observed fluents into batched
+        observations of a vector environment.'''
+        
+        # lifted fluents have the shapes of the single observation space
+        if self.vectorized:
+            return {var: np.reshape(value, (num_envs,) + self.observ_shapes[var])
+                    for (var, value) in values.items()}
+
+        # grounded fluents are stored in row-major order of their objects
+        obs = {}
+        for (var, value) in values.items():
+            value = np.reshape(value, (num_envs, -1))
+            for (i, name) in enumerate(self.observ_groundings[var]):
+                obs[name] = value[:, i]
+        return obs
+
+
+class RDDLVectorEnv(VectorEnv):
+    '''A vector gym environment class that simulates several copies of a RDDL
+    instance at once, by stepping all copies in a single batched call to one
+    shared simulation backend. The domain and instance are parsed and compiled
+    only once.
+
+    A copy whose episode terminates or is truncated is reset on the next call
+    to step(), during which its action is ignored and it returns its initial
+    observation with zero reward (next-step autoreset in gymnasium).
+    '''
+
+    def __init__(self, domain: str,
+                 instance: str,
+                 num_envs: int=1,
+                 enforce_action_constraints: bool=False,
+                 enforce_action_count_non_bool: bool=True,
+                 vectorized: bool=False,
+                 backend: Type[RDDLSimulator]=RDDLSimulator,
+                 backend_kwargs: typing.Dict={},
+                 compiled_cache: Optional[RDDLCompilationCache]=None) -> None:
+        '''Creates a new vector gym environment from the given RDDL domain +
+        instance.
+
+        :param domain: the RDDL domain
+        :param instance: the RDDL instance
+        :param num_envs: the number of copies of the instance to simulate
+        :param enforce_action_constraints: whether to raise an exception if the
+        action constraints are violated
+        :param enforce_action_count_non_bool: whether to include non-bool actions
+        in check that number of nondef actions don't exceed max-nondef-actions
+        :param vectorized: whether actions and states are represented as
+        dictionaries of numpy arrays of lifted fluents (if True), or as
+        dictionaries of grounded fluents; in both cases, values are stacked
+        along a leading axis of size num_envs
+        :param backend: the subclass of RDDLSimulator to use as backend for
+        simulation
+        :param backend_kwargs: dictionary of additional named arguments to
+        pass to backend (must not include logger)
+        :param compiled_cache: a cache on disk of compiled models, None means 
+        no caching
+        '''
+        super(RDDLVectorEnv, self).__init__()
+
+        # the compiled model and spaces are shared by all copies
+        self.env = RDDLEnv(domain, instance,
+                           enforce_action_constraints=enforce_action_constraints,
+                           enforce_action_count_non_bool=enforce_action_count_non_bool,
+                           vectorized=vectorized,
+                           backend=backend,
+                           backend_kwargs=backend_kwargs,
+                           compiled_cache=compiled_cache)
+        self.model = self.env.model
+        self.sampler = self.env.sampler
+        self.horizon = self.env.horizon
+        self.discount = self.env.discount
+        self.enforce_action_constraints = enforce_action_constraints
+        self.enforce_count_non_bool = enforce_action_count_non_bool
+        self.vectorized = vectorized
+
+        # construct the batched gym spaces
+        self.num_envs = num_envs
+        self.single_observation_space = self.env.observation_space
+        self.single_action_space = self.env.action_space
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+        self.metadata = {'autoreset_mode': _NEXT_STEP}
+        self.layout = RDDLBatchLayout(self.env)
+
+        # batched states of all copies
+        self._states = self._initial_values(self.model.state_fluents)
+        self._obs = None
+        if self.sampler.is_pomdp:
+            self._obs = self._initial_values(self.model.observ_fluents)
+        self._timesteps = np.zeros(num_envs, dtype=np.int64)
+        self._autoreset = np.zeros(num_envs, dtype=bool)
+
+    def _initial_values(self, fluents):
+        init_values = self.sampler.init_values
+        return {var: np.repeat(np.asarray(init_values[var])[np.newaxis, ...],
+                               self.num_envs, axis=0)
+                for var in fluents}
+
+    def seed(self, seed: Optional[int]=None) -> Optional[int]:
+        self.sampler.seed(seed)
+        return seed
+
+    def set_visualizer(self, viz, movie_gen=None, movie_per_episode=False, **viz_kwargs):
+        self.env.set_visualizer(viz, movie_gen=movie_gen,
+                                movie_per_episode=movie_per_episode, **viz_kwargs)
+
+    # ===========================================================================
+    # main interface
+    # ===========================================================================
+
+    def _observed_tensors(self):
+        return self._states if self._obs is None else self._obs
+
+    def _observe(self):
+        return self.layout.observation(self._observed_tensors(), self.num_envs)
+
+    def _check_default_action_count(self, actions, active):
+        noop_actions = self.sampler.noop_actions
+        action_ranges = self.model.action_ranges
+        count = np.zeros(self.num_envs, dtype=np.int64)
+        for (var, values) in actions.items():
+            if self.enforce_count_non_bool or action_ranges[var] == 'bool':
+                non_default = np.asarray(values != noop_actions[var])
+                count += np.count_nonzero(
+                    np.reshape(non_default, (self.num_envs, -1)), axis=1)
+        invalid = active & (count > self.model.max_allowed_actions)
+        if np.any(invalid):
+            index = np.flatnonzero(invalid)[0]
+            raise RDDLInvalidActionError(
+                f'Expected at most {self.model.max_allowed_actions} '
+                f'non-default actions, got {count[index]} in environment {index}.')
+
+    def _check_action_preconditions(self, actions, active):
+        satisfied = self.sampler.check_preconditions_batch(self._states, actions)
+        invalid = active & ~satisfied
+        if np.any(invalid):
+            index = np.flatnonzero(invalid)[0]
+            raise RDDLActionPreconditionNotSatisfiedError(
+                f'Action preconditions are not satisfied in environment {index}.')
+
+    def _reset_envs(self, mask):
+        init_values = self.sampler.init_values
+        for values in (self._states, self._obs):
+            if values is not None:
+                for (var, value) in values.items():
+                    value = values[var] = np.array(value)
+                    value[mask] = init_values[var]
+        self._timesteps[mask] = 0
+        self._autoreset[mask] = False
+
+    def step(self, actions: Any) -> Tuple[Any, np.ndarray, np.ndarray, np.ndarray, Any]:
+        resetting = self._autoreset.copy()
+        active = ~resetting
+
+        # fix actions and check constraints of copies that are not being reset
+        actions = self.layout.lifted_actions(actions, self.num_envs)
+        self._check_default_action_count(actions, active)
+        if self.enforce_action_constraints:
+            self._check_action_preconditions(actions, active)
+
+        # sample next state and reward of all copies at once
+        next_states, rewards, terminated, obs = self.sampler.step_batch(
+            self._states, actions)
+        self._states = next_states
+        if self._obs is not None:
+            self._obs = obs
+
+        # check if the state invariants are satisfied and the horizon is reached
+        truncated = ~self.sampler.check_state_invariants_batch(next_states)
+        self._timesteps += 1
+        truncated |= self._timesteps >= self.horizon
+
+        # copies that ended in the previous step start a new episode
+        rewards = np.where(resetting, 0.0, rewards)
+        terminated = terminated & active
+        truncated = truncated & active
+        if np.any(resetting):
+            self._reset_envs(resetting)
+        self._autoreset = terminated | truncated
+
+        return self._observe(), rewards, terminated, truncated, {}
+
+    def reset(self, seed: Optional[int]=None,
+              options: Optional[typing.Dict[str, Any]]=None) -> Tuple[Any, Any]:
+        '''Resets all copies, or only the copies in options['reset_mask'] if
+        provided. A single integer seed seeds the generator shared by all copies.
+        '''
+        if seed is not None:
+            self.seed(seed)
+        mask = np.ones(self.num_envs, dtype=bool)
+        if options is not None and options.get('reset_mask', None) is not None:
+            mask = np.asarray(options['reset_mask'], dtype=bool)
+        self._reset_envs(mask)
+        return self._observe(), {}
+
+    def render(self) -> Tuple[Any, ...]:
+        visualizer = self.env._visualizer
+        if visualizer is None:
+            return None
+        images = []
+        for i in range(self.num_envs):
+            state = {var: value[i] for (var, value) in self._states.items()}
+            images.append(visualizer.render(self.model.ground_vars_with_values(state)))
+        return tuple(images)
+
+    def close_extras(self, **kwargs: Any) -> None:
+        self.env.close()
+
+
+# ===========================================================================
+# helper functions for the subprocess vector environment
+# ===========================================================================
+
+
+def _shared_offsets(specs):
+    offsets, offset = [], 0
+    for (_, shape, dtype) in specs:
+        offsets.append(offset)
+        size = int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize
+        offset += -(-size // 8) * 8
+    return offsets, max(offset, 1)
+
+
+def _shared_arrays(buffer, specs):
+    offsets, _ = _shared_offsets(specs)
+    return {key: np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+            for ((key, shape, dtype), offset) in zip(specs, offsets)}
+
+
+def _subproc_worker(index, domain, instance, num_envs, env_kwargs, seed, pipe):
+    env, shm, arrays, envs = None, None, None, slice(None)
+    
+    def _write_outputs():
+        for (var, value) in env._observed_tensors().items():
+            arrays['obs:' + var][envs] = value
+    
+    try:
+        env = make(domain, instance, base_class=RDDLVectorEnv,
+                   num_envs=num_envs, **env_kwargs)
+        env.seed(seed)
+        info = None
+        if index == 0:
+            info = (env.layout, env.single_observation_space,
+                    env.single_action_space, env.horizon, env.discount)
+        pipe.send(('ok', info))
+    except Exception as e:
+        pipe.send(('error', e))
+        pipe.close()
+        return
+    
+    try:
+        while True:
+            command, data = pipe.recv()
+            try:
+                if command == 'attach':
+                    name, specs, start = data
+                    
+                    # only the parent unlinks the buffer, so a worker that does 
+                    # not share the resource tracker of the parent must not let
+                    # its own tracker report the buffer as leaked
+                    own_tracker = os.name == 'posix' \
+                        and resource_tracker._resource_tracker._fd is None
+                    shm = shared_memory.SharedMemory(name=name)
+                    if own_tracker:
+                        resource_tracker.unregister(shm._name, 'shared_memory')
+                    arrays = _shared_arrays(shm.buf, specs)
+                    envs = slice(start, start + num_envs)
+                    pipe.send(('ok', None))
+                elif command == 'reset':
+                    seed, mask = data
+                    env.reset(seed=seed, options={'reset_mask': mask[envs]})
+                    _write_outputs()
+                    pipe.send(('ok', None))
+                elif command == 'step':
+                    actions = {var: arrays['action:' + var][envs]
+                               for var in env.layout.noop_actions}
+                    _, rewards, terminated, truncated, _ = env.step(actions)
+                    _write_outputs()
+                    arrays['reward'][envs] = rewards
+                    arrays['terminated'][envs] = terminated
+                    arrays['truncated'][envs] = truncated
+                    pipe.send(('ok', None))
+                elif command == 'close':
+                    pipe.send(('ok', None))
+                    break
+            except Exception as e:
+                pipe.send(('error', e))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        arrays = None
+        if shm is not None:
+            shm.close()
+        env.close()
+        pipe.close()
+
+
+class RDDLSubprocVectorEnv(VectorEnv):
+    '''A vector gym environment class that simulates copies of a RDDL instance
+    in worker processes. Each worker compiles the instance once and steps its 
+    copies in a single batched call, as in RDDLVectorEnv. Observations, 
+    actions, rewards and termination flags are exchanged through preallocated
+    shared memory laid out from the shapes of the lifted fluent tensors, so only
+    short commands are sent to the workers at each step.
+    
+    Copies are reset on the next step after their episode ends, as in 
+    RDDLVectorEnv.
+    '''
+
+    def __init__(self, domain: str,
+                 instance: str,
+                 num_envs: int=1,
+                 num_workers: Optional[int]=None,
+                 context: Optional[str]=None,
+                 copy: bool=True,
+                 **env_kwargs) -> None:
+        '''Creates a new vector gym environment from the given RDDL domain +
+        instance, whose copies are simulated in worker processes.
+
+        :param domain: the RDDL domain, or its name in rddlrepository
+        :param instance: the RDDL instance, or its name in rddlrepository
+        :param num_envs: the number of copies of the instance to simulate
+        :param num_workers: the number of worker processes, among which the 
+        copies are divided as evenly as possible (defaults to the number of CPUs)
+        :param context: the multiprocessing start method (e.g., spawn), or None 
+        to use the default start method
+        :param copy: whether to return copies of the observations, rather than
+        views of the shared memory that are overwritten by the next step or reset
+        :param **env_kwargs: other arguments to pass to the RDDLVectorEnv of 
+        each worker (domain and instance must be picklable) 
+        '''
+        super(RDDLSubprocVectorEnv, self).__init__()
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        num_workers = max(1, min(num_workers, num_envs))
+        sizes = [len(envs) for envs in 
+                 np.array_split(np.arange(num_envs), num_workers)]
+        
+        self.num_envs = num_envs
+        self.copy = copy
+        self._shm = None
+        self._pipes = []
+        self._processes = []
+        self._waiting = None
+        
+        # terminate the workers already started if any of them fails
+        try:
+            self._start_workers(domain, instance, sizes, context, env_kwargs)
+        except BaseException:
+            self.close_extras()
+            self.closed = True
+            raise
+    
+    def _start_workers(self, domain, instance, sizes, context, env_kwargs):
+        num_envs = self.num_envs
+        
+        # start workers, each of which compiles the instance once and samples
+        # from its own generator, since forked workers would otherwise share 
+        # the state of the default generator
+        ctx = multiprocessing.get_context(context)
+        seeds = np.random.SeedSequence().spawn(len(sizes))
+        
+        # workers inherit the resource tracker of the parent if it is running
+        if os.name == 'posix':
+            resource_tracker.ensure_running()
+        for (index, size) in enumerate(sizes):
+            parent_pipe, child_pipe = ctx.Pipe()
+            process = ctx.Process(
+                target=_subproc_worker, 
+                name=f'{type(self).__name__}-worker-{index}',
+                args=(index, domain, instance, size, env_kwargs, seeds[index], 
+                      child_pipe),
+                daemon=True)
+            process.start()
+            child_pipe.close()
+            self._pipes.append(parent_pipe)
+            self._processes.append(process)
+        info = self._receive()[0]
+        (self.layout, self.single_observation_space, self.single_action_space, 
+         self.horizon, self.discount) = info
+        
+        # construct the batched gym spaces
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+        self.metadata = {'autoreset_mode': _NEXT_STEP}
+        
+        # allocate the shared buffers and attach the workers to them
+        specs = [('obs:' + var, (num_envs,) + shape, dtype) 
+                 for (var, (shape, dtype)) in self.layout.observ_tensors.items()]
+        specs += [('action:' + var, (num_envs,) + value.shape, value.dtype)
+                  for (var, value) in self.layout.noop_actions.items()]
+        specs += [('reward', (num_envs,), np.float64),
+                  ('terminated', (num_envs,), np.bool_),
+                  ('truncated', (num_envs,), np.bool_)]
+        _, size = _shared_offsets(specs)
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self._arrays = _shared_arrays(self._shm.buf, specs)
+        starts = np.cumsum([0] + sizes[:-1])
+        self._send('attach', [(self._shm.name, specs, int(start)) 
+                              for start in starts])
+        self._receive()
+    
+    def _receive(self, timeout=None):
+        
+        # wait for all replies before reading any, so that after a timeout the 
+        # pending call remains pending and can be waited for again
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+            for pipe in self._pipes:
+                if not pipe.poll(max(0.0, deadline - time.monotonic())):
+                    raise multiprocessing.TimeoutError(
+                        f'Worker processes did not respond within {timeout} seconds.')
+        results, error = [], None
+        for pipe in self._pipes:
+            status, result = pipe.recv()
+            if status == 'error' and error is None:
+                error = result
+            results.append(result)
+        self._waiting = None
+        if error is not None:
+            raise error
+        return results
+    
+    def _observe(self):
+        values = {var: self._arrays['obs:' + var] 
+                  for var in self.layout.observ_tensors}
+        obs = self.layout.observation(values, self.num_envs)
+        if self.copy:
+            obs = {name: np.copy(value) for (name, value) in obs.items()}
+        return obs
+    
+    def _send(self, command, data):
+        if self.closed:
+            raise ClosedEnvironmentError(
+                'Trying to operate on a vector environment that was closed.')
+        if self._waiting is not None:
+            raise AlreadyPendingCallError(
+                f'Calling {command} while waiting for a pending call to '
+                f'{self._waiting} to complete.', self._waiting)
+        for (pipe, worker_data) in zip(self._pipes, data):
+            pipe.send((command, worker_data))
+        self._waiting = command
+    
+    def _wait(self, command, timeout):
+        if self._waiting != command:
+            raise NoAsyncCallError(
+                f'Calling {command}_wait without any prior call to '
+                f'{command}_async.', command)
+        self._receive(timeout)
+    
+    # ===========================================================================
+    # main interface
+    # ===========================================================================
+    
+    def reset_async(self, seed: Optional[int]=None,
+                    options: Optional[typing.Dict[str, Any]]=None) -> None:
+        '''Sends a reset command to the workers, and returns without waiting for
+        the reset to complete. An integer seed is offset by the index of each
+        worker to seed its generator, and otherwise each worker keeps sampling 
+        from its own independently seeded generator.'''
+        mask = np.ones(self.num_envs, dtype=bool)
+        if options is not None and options.get('reset_mask', None) is not None:
+            mask = np.asarray(options['reset_mask'], dtype=bool)
+        self._send('reset', [(None if seed is None else seed + index, mask)
+                             for index in range(len(self._pipes))])
+    
+    def reset_wait(self, timeout: Optional[float]=None) -> Tuple[Any, Any]:
+        '''Waits for the workers to complete the pending reset, and returns the
+        initial observations.'''
+        self._wait('reset', timeout)
+        return self._observe(), {}
+        
+    def reset(self, seed: Optional[int]=None,
+              options: Optional[typing.Dict[str, Any]]=None) -> Tuple[Any, Any]:
+        self.reset_async(seed=seed, options=options)
+        return self.reset_wait()
+    
+    def step_async(self, actions: Any) -> None:
+        '''Writes the actions to shared memory and sends a step command to the
+        workers, and returns without waiting for the step to complete.'''
+        actions = self.layout.lifted_actions(actions, self.num_envs)
+        for (var, default) in self.layout.noop_actions.items():
+            self._arrays['action:' + var][...] = actions.get(var, default)
+        self._send('step', [None] * len(self._pipes))
+    
+    def step_wait(self, timeout: Optional[float]=None) -> Tuple[Any, np.ndarray, np.ndarray, np.ndarray, Any]:
+        '''Waits for the workers to complete the pending step, and returns the
+        batched results.'''
+        self._wait('step', timeout)
+        arrays = self._arrays
+        return (self._observe(), 
+                np.copy(arrays['reward']), 
+                np.copy(arrays['terminated']), 
+                np.copy(arrays['truncated']), 
+                {})
+    
+    def step(self, actions: Any) -> Tuple[Any, np.ndarray, np.ndarray, np.ndarray, Any]:
+        self.step_async(actions)
+        return self.step_wait()
+    
+    def close_extras(self, timeout: Optional[float]=None, **kwargs: Any) -> None:
+        
+        # let the workers finish their pending call and exit
+        try:
+            if self._waiting is not None:
+                self._receive(timeout)
+        except Exception:
+            pass
+        for pipe in self._pipes:
+            try:
+                pipe.send(('close', None))
+            except (OSError, ValueError):
+                pass
+        for pipe in self._pipes:
+            try:
+                if timeout is None or pipe.poll(timeout):
+                    pipe.recv()
+            except (OSError, EOFError, ValueError):
+                pass
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        for pipe in self._pipes:
+            pipe.close()
+        
+        # release the shared buffers
+        if self._shm is not None:
+            self._arrays = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+    
+    def __del__(self):
+        if not getattr(self, 'closed', True):
+            self.close()
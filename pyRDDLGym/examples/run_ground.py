@@ -2,11 +2,13 @@
 
 The syntax for running this example is:
 
-    python run_ground.py <domain> <instance>
-    
+    python run_ground.py <domain> <instance> [<output>]
+
 where:
     <domain> is the name of a domain located in the /Examples directory
     <instance> is the instance number
+    <output> is an optional file to write the grounded domain to instead of
+    printing it, which is compressed with gzip if it ends with .gz
 '''
 import sys
 
@@ -15,26 +17,32 @@ from pyRDDLGym.core.debug.decompiler import RDDLDecompiler
 from pyRDDLGym.core.grounder import RDDLGrounder
 
 
-def main(domain, instance):
-    
+def main(domain, instance, output=None):
+
     # create the environment
     env = pyRDDLGym.make(domain, instance, enforce_action_constraints=False)
-    
+
     # ground the model
     grounder = RDDLGrounder(env.model.ast)
     grounded_model = grounder.ground()
-    
-    # decompile and print model
+
+    # decompile and print or write model, one CPF at a time
     decompiler = RDDLDecompiler()
-    print(decompiler.decompile_domain(grounded_model))
-    
+    if output is None:
+        decompiler.write_domain(grounded_model, sys.stdout)
+        print()
+    else:
+        decompiler.write_domain(grounded_model, output)
+
     env.close()
 
 
 if __name__ == "__main__":
     args = sys.argv[1:]
     if len(args) < 2:
-        print('python run_ground.py <domain> <instance>')
+        print('python run_ground.py <domain> <instance> [<output>]')
         exit(1)
     kwargs = {'domain': args[0], 'instance': args[1]}
+    if len(args) >= 3:
+        kwargs['output'] = args[2]
     main(**kwargs)
@@ -1,7 +1,10 @@
+from collections import OrderedDict
 import importlib
+import inspect
 import os
-from typing import Type
+from typing import Any, Hashable, Optional, Type
 
+from pyRDDLGym.core.cache import default_compilation_cache
 from pyRDDLGym.core.env import RDDLEnv
 
 VALID_EXT = '.rddl'
@@ -9,7 +12,103 @@ REPO_MANAGER_MODULE = 'rddlrepository'  # uses alias
 REPO_MANAGER_CLASS = 'RDDLRepoManager'
 
 
-def make(domain: str, instance: str, base_class: Type[RDDLEnv]=RDDLEnv, **env_kwargs) -> RDDLEnv:
+class RDDLTemplateRegistry:
+    '''An in-memory registry of compiled environments used as templates by 
+    make(), and of problems looked up in rddlrepository, each of which keeps 
+    its most recently used entries up to a maximum number.'''
+    
+    def __init__(self, max_templates: int=32, max_problems: int=256) -> None:
+        '''Creates a new empty registry.
+        
+        :param max_templates: the maximum number of environment templates kept
+        :param max_problems: the maximum number of rddlrepository problems kept
+        '''
+        self.max_templates = max_templates
+        self.max_problems = max_problems
+        self._templates = OrderedDict()
+        self._problems = OrderedDict()
+        self._manager = None
+    
+    @staticmethod
+    def _get(table, key):
+        value = table.get(key, None)
+        if value is not None:
+            table.move_to_end(key)
+        return value
+    
+    @staticmethod
+    def _put(table, key, value, max_size):
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > max_size:
+            table.popitem(last=False)
+    
+    def get_template(self, key: Hashable) -> Optional[Any]:
+        '''Returns the environment template stored for key, or None.'''
+        return self._get(self._templates, key)
+    
+    def put_template(self, key: Hashable, env: Any) -> None:
+        '''Stores an environment template for key.'''
+        self._put(self._templates, key, env, self.max_templates)
+    
+    def get_problem(self, domain: str) -> Any:
+        '''Returns the rddlrepository problem info for the domain identifier.'''
+        info = self._get(self._problems, domain)
+        if info is None:
+            if self._manager is None:
+                module = importlib.import_module(REPO_MANAGER_MODULE)
+                self._manager = getattr(module, REPO_MANAGER_CLASS)()
+            info = self._manager.get_problem(domain)
+            self._put(self._problems, domain, info, self.max_problems)
+        return info
+    
+    def clear(self) -> None:
+        '''Removes all templates and problems from the registry.'''
+        self._templates.clear()
+        self._problems.clear()
+        self._manager = None
+
+
+TEMPLATES = RDDLTemplateRegistry()
+
+
+# types of arguments that are compared by value in the keys of templates
+TEMPLATE_KEY_TYPES = (type(None), bool, int, float, complex, str, bytes, type)
+
+
+def _frozen_argument(value):
+    if isinstance(value, TEMPLATE_KEY_TYPES):
+        return value
+    elif isinstance(value, (tuple, list)):
+        return (type(value).__name__,) + tuple(map(_frozen_argument, value))
+    elif isinstance(value, dict):
+        items = sorted(value.items(), key=lambda item: repr(item[0]))
+        return ('dict',) + tuple((_frozen_argument(key), _frozen_argument(arg)) 
+                                 for (key, arg) in items)
+    raise TypeError(f'Argument of type {type(value)} is not compared by value.')
+
+
+def _template_key(domain, instance, base_class, env_kwargs):
+    
+    # environments with arguments that cannot be compared by value (e.g., 
+    # loggers or other objects) are not templated, since each call would add
+    # a new template; the compilation cache does not affect the environment
+    try:
+        arguments = tuple(sorted(
+            (name, _frozen_argument(value)) 
+            for (name, value) in env_kwargs.items() if name != 'compiled_cache'))
+    except TypeError:
+        return None
+    
+    # templates of rddl files are invalidated when the files are modified
+    stamps = tuple(os.stat(path).st_mtime_ns 
+                   if isinstance(path, str) and os.path.isfile(path) else None
+                   for path in (domain, instance))
+    return (base_class, domain, instance, stamps, arguments)
+
+
+def make(domain: str, instance: str, base_class: Type[RDDLEnv]=RDDLEnv, 
+         use_templates: bool=True, **env_kwargs) -> RDDLEnv:
     '''Creates a new RDDLEnv gym environment from domain and instance identifier
     or local file paths. 
     
@@ -22,8 +121,37 @@ def make(domain: str, instance: str, base_class: Type[RDDLEnv]=RDDLEnv, **env_kw
     :param domain: the domain identifier, or path to domain rddl
     :param instance: the instance identifier, or path to instance rddl
     :param base_class: a subclass of RDDLEnv to load
-    :param **env_kwargs: other arguments to pass to the RDDLEnv. 
+    :param use_templates: whether to keep a compiled template of the environment
+    in memory, so that later calls with the same arguments return clones of it
+    that share its model and compiled structures (not used when logging, or
+    when an argument is an object that is not compared by value)
+    :param **env_kwargs: other arguments to pass to the RDDLEnv. Unless 
+    compiled_cache is given, compiled models are loaded from and saved to a
+    cache on disk only if the PYRDDLGYM_CACHE_DIR environment variable is set
+    to its directory (pass compiled_cache=RDDLCompilationCache() to cache in 
+    ~/.cache/pyRDDLGym, or compiled_cache=None to disable caching).
     '''
+    if 'compiled_cache' in inspect.signature(base_class).parameters:
+        env_kwargs.setdefault('compiled_cache', default_compilation_cache())
+    
+    # return a clone of a template of the environment if one was compiled
+    key = None
+    if use_templates and hasattr(base_class, 'clone') \
+    and not env_kwargs.get('debug_path', None) \
+    and not env_kwargs.get('log_path', None):
+        key = _template_key(domain, instance, base_class, env_kwargs)
+    if key is not None:
+        template = TEMPLATES.get_template(key)
+        if template is not None:
+            return template.clone()
+    env = _make(domain, instance, base_class, **env_kwargs)
+    if key is not None:
+        TEMPLATES.put_template(key, env)
+        env = env.clone()
+    return env
+
+
+def _make(domain, instance, base_class, **env_kwargs):
     
     # check if arguments are file paths
     domain_is_file = os.path.isfile(domain)
@@ -50,10 +178,8 @@ def make(domain: str, instance: str, base_class: Type[RDDLEnv]=RDDLEnv, **env_kw
         raise ImportError('rddlrepository is not installed: '
                           'can be installed with \'pip install rddlrepository\'.')
     
-    # load the repository manager
-    module = importlib.import_module(REPO_MANAGER_MODULE)
-    manager = getattr(module, REPO_MANAGER_CLASS)()
-    info = manager.get_problem(domain)
+    # load the problem from the repository manager
+    info = TEMPLATES.get_problem(domain)
         
     # extract environment
     domain_path = info.get_domain()
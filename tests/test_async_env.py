@@ -0,0 +1,54 @@
+import asyncio
+
+import numpy as np
+
+import pyRDDLGym
+from pyRDDLGym import AsyncRDDLEnv, RDDLVectorEnv, pipelined_rollout
+
+
+def _make_half():
+    return pyRDDLGym.make('Wildfire_MDP_ippc2014', '1', 
+                          base_class=RDDLVectorEnv, num_envs=2, 
+                          vectorized=True, compiled_cache=None)
+
+
+def test_pipelined_rollout_matches_sequential_stepping():
+    steps = 10
+    
+    async def run():
+        envs = [AsyncRDDLEnv(_make_half()) for _ in range(2)]
+        try:
+            return await pipelined_rollout(envs, lambda obs: {}, steps, seed=3)
+        finally:
+            for env in envs:
+                await env.close()
+    returns = asyncio.run(run())
+    
+    for (index, expected) in enumerate(returns):
+        env = _make_half()
+        env.reset(seed=3 + index)
+        total = 0.0
+        for _ in range(steps):
+            total = total + env.step({})[1]
+        assert np.array_equal(total, expected)
+        env.close()
+
+
+def test_pipelined_rollout_awaits_coroutine_policies():
+    calls = []
+    
+    async def policy(obs):
+        calls.append(obs)
+        await asyncio.sleep(0)
+        return {}
+    
+    async def run():
+        envs = [AsyncRDDLEnv(_make_half()) for _ in range(2)]
+        try:
+            return await pipelined_rollout(envs, policy, 3)
+        finally:
+            for env in envs:
+                await env.close()
+    returns = asyncio.run(run())
+    assert len(calls) == 6
+    assert all(np.shape(total) == (2,) for total in returns)
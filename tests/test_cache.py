@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+import pytest
+
+import pyRDDLGym
+from pyRDDLGym.core.cache import RDDLCompilationCache
+from pyRDDLGym.core.env import RDDLEnv
+
+
+def _rollout(env, steps=20):
+    trajectory = []
+    env.reset(seed=7)
+    for _ in range(steps):
+        obs, reward, terminated, truncated, _ = env.step({})
+        trajectory.append((obs, reward, terminated, truncated))
+        if terminated or truncated:
+            env.reset()
+    return trajectory
+
+
+def _assert_same_trajectory(first, second):
+    assert len(first) == len(second)
+    for ((obs1, *rest1), (obs2, *rest2)) in zip(first, second):
+        assert rest1 == rest2
+        assert obs1.keys() == obs2.keys()
+        for name in obs1:
+            assert np.array_equal(obs1[name], obs2[name])
+
+
+@pytest.mark.parametrize('domain, instance', [
+    ('Wildfire_MDP_ippc2014', '1'),
+    ('Reservoir_Continuous', '1'),
+    ('CartPole_Continuous_gym', '0')
+])
+def test_disk_and_template_caches_return_equivalent_envs(tmp_path, domain, instance):
+    cache = RDDLCompilationCache(str(tmp_path))
+    reference = _rollout(pyRDDLGym.make(domain, instance, use_templates=False,
+                                        compiled_cache=None))
+    
+    # the first env compiles and saves the model, the second loads it
+    for _ in range(2):
+        env = pyRDDLGym.make(domain, instance, use_templates=False,
+                             compiled_cache=cache)
+        _assert_same_trajectory(_rollout(env), reference)
+    assert os.listdir(str(tmp_path))
+    
+    # clones of a template are equivalent to a newly compiled env
+    for _ in range(2):
+        env = pyRDDLGym.make(domain, instance, compiled_cache=None)
+        _assert_same_trajectory(_rollout(env), reference)
+
+
+def test_disk_cache_is_opt_in(monkeypatch, tmp_path):
+    home = tmp_path / 'home'
+    monkeypatch.setenv('HOME', str(home))
+    monkeypatch.delenv('PYRDDLGYM_CACHE_DIR', raising=False)
+    pyRDDLGym.make('Wildfire_MDP_ippc2014', '1', use_templates=False)
+    assert not home.exists()
+    
+    directory = tmp_path / 'cache'
+    monkeypatch.setenv('PYRDDLGYM_CACHE_DIR', str(directory))
+    pyRDDLGym.make('Wildfire_MDP_ippc2014', '1', use_templates=False)
+    assert os.listdir(str(directory))
+
+
+def test_cache_skips_missing_files(tmp_path):
+    cache = RDDLCompilationCache(str(tmp_path))
+    assert cache.key(None, None) is None
+    
+    # an env built from a compiled model does not read or write the cache
+    model = pyRDDLGym.make('Wildfire_MDP_ippc2014', '1').model
+    env = RDDLEnv(domain=None, instance=None, model=model, compiled_cache=cache)
+    env.reset()
+    env.step({})
+    assert not os.listdir(str(tmp_path))
+
+
+def test_cache_ignores_entries_that_cannot_be_pickled(tmp_path):
+    cache = RDDLCompilationCache(str(tmp_path))
+    with pytest.warns(UserWarning):
+        cache.store('key', {'value': lambda x: x})
+    assert cache.load('key') is None
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+import pyRDDLGym
+
+
+def _make(domain='Wildfire_MDP_ippc2014', instance='1', **env_kwargs):
+    return pyRDDLGym.make(domain, instance, use_templates=False, 
+                          compiled_cache=None, **env_kwargs)
+
+
+def test_rollout_matches_stepping():
+    trajectories = _make().rollout(lambda obs: {}, episodes=2, seed=5)
+    
+    env = _make(vectorized=True)
+    env.seed(5)
+    for episode in range(2):
+        env.reset()
+        for step in range(env.horizon):
+            _, reward, terminated, truncated, _ = env.step({})
+            assert reward == trajectories['reward'][episode, step]
+            assert terminated == trajectories['terminated'][episode, step]
+            assert truncated == trajectories['truncated'][episode, step]
+            if terminated or truncated:
+                break
+        assert trajectories['length'][episode] == step + 1
+
+
+def test_rollout_does_not_advance_env_generator():
+    rewards = []
+    for do_rollout in (False, True):
+        env = _make()
+        env.reset(seed=3)
+        if do_rollout:
+            env.rollout(lambda obs: {}, episodes=2, seed=9)
+        rewards.append([env.step({})[1] for _ in range(10)])
+    assert np.array_equal(rewards[0], rewards[1])
+
+
+def test_views_are_read_only_and_match_copies():
+    for vectorized in (True, False):
+        views, copies = _make(vectorized=vectorized, copy=False), \
+            _make(vectorized=vectorized)
+        observations = [views.reset(seed=1)[0], copies.reset(seed=1)[0]]
+        for _ in range(5):
+            view, obs = observations
+            assert view.keys() == obs.keys()
+            for (var, value) in view.items():
+                assert np.array_equal(value, obs[var])
+                if vectorized:
+                    assert not value.flags.writeable
+                    with pytest.raises(ValueError):
+                        value[...] = value
+            
+            # grounded values are exposed through read-only mappings
+            if not vectorized:
+                var = next(iter(view))
+                with pytest.raises(TypeError):
+                    view[var] = obs[var]
+                with pytest.raises(TypeError):
+                    views.state[var] = obs[var]
+            observations = [views.step({})[0], copies.step({})[0]]
@@ -0,0 +1,76 @@
+import numpy as np
+
+import pyRDDLGym
+from pyRDDLGym.core.env import RDDLEnv
+from pyRDDLGym.core.grounder import RDDLGrounder
+from pyRDDLGym.core.simulator import RDDLSimulator
+
+DOMAIN = '''
+domain simplify_test {
+    requirements = {reward-deterministic};
+    pvariables {
+        ZERO : { non-fluent, real, default = 0.0 };
+        ONE : { non-fluent, int, default = 1 };
+        FLAG : { non-fluent, bool, default = false };
+        c : { state-fluent, int, default = 1 };
+        x : { state-fluent, real, default = 0.0 };
+        y : { state-fluent, real, default = 0.0 };
+        z : { state-fluent, real, default = 1.0 };
+        b : { state-fluent, bool, default = false };
+        a : { action-fluent, int, default = 0 };
+    };
+    cpfs {
+        c' = c + a + 1;
+        x' = c + ZERO;
+        y' = c * ONE * 1.0;
+        z' = c * ZERO;
+        b' = FLAG | (c > 2);
+    };
+    reward = c * ONE + ZERO;
+}
+'''
+
+INSTANCE = '''
+non-fluents simplify_nf { domain = simplify_test; }
+instance simplify_inst { 
+    domain = simplify_test; non-fluents = simplify_nf; 
+    max-nondef-actions = pos-inf; horizon = 5; discount = 1.0; 
+}
+'''
+
+
+def _simulate(ast, simplify, steps):
+    model = RDDLGrounder(ast, simplify=simplify).ground()
+    sim = RDDLSimulator(model, rng=np.random.default_rng(0), keep_tensors=True)
+    sim.reset()
+    trajectory = []
+    for _ in range(steps):
+        _, reward, _ = sim.step({})
+        trajectory.append((reward, {var: np.asarray(value) 
+                                    for (var, value) in sim.subs.items()}))
+    return trajectory
+
+
+def _assert_same_types(ast, steps, compare_values):
+    for ((reward, subs), (simple_reward, simple_subs)) in zip(
+        _simulate(ast, False, steps), _simulate(ast, True, steps)):
+        assert type(reward) is type(simple_reward)
+        assert subs.keys() == simple_subs.keys()
+        for (var, value) in subs.items():
+            assert value.dtype == simple_subs[var].dtype, var
+            if compare_values:
+                assert np.array_equal(value, simple_subs[var]), var
+
+
+def test_simplification_preserves_result_types(tmp_path):
+    domain, instance = tmp_path / 'domain.rddl', tmp_path / 'instance.rddl'
+    domain.write_text(DOMAIN)
+    instance.write_text(INSTANCE)
+    ast = RDDLEnv(str(domain), str(instance)).model.ast
+    _assert_same_types(ast, 5, compare_values=True)
+
+
+def test_simplification_preserves_types_of_bundled_domain():
+    env = pyRDDLGym.make('Wildfire_MDP_ippc2014', '1', use_templates=False, 
+                         compiled_cache=None)
+    _assert_same_types(env.model.ast, 10, compare_values=False)
@@ -0,0 +1,94 @@
+from pyRDDLGym.core.env import RDDLEnv
+from pyRDDLGym.core.simulator import RDDLSimulator
+
+DOMAIN = '''
+domain conditions_test {
+    requirements = {reward-deterministic};
+    pvariables {
+        LIMIT : { non-fluent, real, default = 1.0 };
+        x : { state-fluent, real, default = 0.0 };
+        a : { action-fluent, real, default = 0.0 };
+    };
+    cpfs { x' = x + Normal(a, 1.0); };
+    reward = x;
+    termination { Bernoulli(0.1); x > 100.0; };
+    state-invariants { LIMIT >= 0; Bernoulli(0.5) | x < 1000.0; };
+}
+'''
+
+INSTANCE = '''
+non-fluents conditions_nf { domain = conditions_test; }
+instance conditions_inst { 
+    domain = conditions_test; non-fluents = conditions_nf; 
+    max-nondef-actions = pos-inf; horizon = 20; discount = 1.0; 
+}
+'''
+
+
+def _make(tmp_path, **env_kwargs):
+    domain, instance = tmp_path / 'domain.rddl', tmp_path / 'instance.rddl'
+    domain.write_text(DOMAIN)
+    instance.write_text(INSTANCE)
+    return RDDLEnv(str(domain), str(instance), **env_kwargs)
+
+
+def test_state_conditions_match_separate_checks(tmp_path):
+    fused, separate = _make(tmp_path).sampler, _make(tmp_path).sampler
+    fused.seed(11)
+    separate.seed(11)
+    for sim in (fused, separate):
+        sim.reset()
+    for _ in range(50):
+        fused.step({})
+        separate.step({})
+        terminated = separate.check_terminal_states()
+        satisfied = separate.check_state_invariants(silent=True)
+        assert fused.check_state_conditions() == (satisfied, terminated)
+        assert fused.rng.bit_generator.state == separate.rng.bit_generator.state
+
+
+def test_state_conditions_follow_non_fluent_changes(tmp_path):
+    sim = _make(tmp_path).sampler
+    sim.reset()
+    for limit in (1.0, -1.0, 1.0):
+        sim.set_non_fluents({'LIMIT': limit})
+        sim.seed(3)
+        terminated = sim.check_terminal_states()
+        satisfied = sim.check_state_invariants(silent=True)
+        sim.seed(3)
+        assert sim.check_state_conditions() == (satisfied, terminated)
+        if limit < 0:
+            assert not satisfied
+
+
+class _NoFlagSimulator(RDDLSimulator):
+    '''A backend that always checks for terminal states in step() and reset(),
+    and does not expose the flag to skip these checks.'''
+    
+    def __init__(self, *args, **kwargs):
+        super(_NoFlagSimulator, self).__init__(*args, **kwargs)
+        del self.check_terminations
+    
+    def _with_terminal_checks(self, method, *args):
+        self.check_terminations = True
+        try:
+            return method(*args)
+        finally:
+            del self.check_terminations
+    
+    def step(self, actions):
+        return self._with_terminal_checks(super(_NoFlagSimulator, self).step, actions)
+    
+    def reset(self):
+        return self._with_terminal_checks(super(_NoFlagSimulator, self).reset)
+
+
+def test_env_accepts_backends_without_terminal_check_flag(tmp_path):
+    env = _make(tmp_path, backend=_NoFlagSimulator)
+    assert not hasattr(env.sampler, 'check_terminations')
+    env.reset(seed=0)
+    for _ in range(20):
+        _, _, terminated, truncated, _ = env.step({})
+        if terminated or truncated:
+            env.reset()
+    assert not hasattr(env.sampler, 'check_terminations')
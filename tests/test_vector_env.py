@@ -0,0 +1,81 @@
+import subprocess
+import sys
+
+import numpy as np
+
+import pyRDDLGym
+from pyRDDLGym.core.vector_env import RDDLSubprocVectorEnv, RDDLVectorEnv
+
+
+def test_batched_stepping_matches_sequential_stepping():
+    domain, instance, num_envs = 'CartPole_Continuous_gym', '0', 4
+    vector_env = pyRDDLGym.make(domain, instance, base_class=RDDLVectorEnv, 
+                                num_envs=num_envs, vectorized=True,
+                                compiled_cache=None)
+    envs = [pyRDDLGym.make(domain, instance, vectorized=True, 
+                           use_templates=False, compiled_cache=None)
+            for _ in range(num_envs)]
+    
+    # the domain is deterministic, so the copies only differ in their actions
+    vector_obs, _ = vector_env.reset()
+    obs = [env.reset()[0] for env in envs]
+    done = [False] * num_envs
+    resets = 0
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        forces = rng.uniform(-10.0, 10.0, size=num_envs)
+        vector_obs, rewards, terminated, truncated, _ = vector_env.step(
+            {'force': forces})
+        for (i, env) in enumerate(envs):
+            
+            # a copy that ended is reset on the next step and ignores its action
+            if done[i]:
+                obs[i], _ = env.reset()
+                resets += 1
+                reward, term, trunc = 0.0, False, False
+            else:
+                obs[i], reward, term, trunc, _ = env.step({'force': forces[i]})
+            done[i] = term or trunc
+            assert rewards[i] == reward
+            assert terminated[i] == term
+            assert truncated[i] == trunc
+            for (var, value) in obs[i].items():
+                assert np.array_equal(vector_obs[var][i], value)
+    assert resets > 0
+
+
+def test_unseeded_workers_diverge():
+    env = RDDLSubprocVectorEnv('Wildfire_MDP_ippc2014', '1', num_envs=4,
+                               num_workers=4, vectorized=True)
+    env.reset()
+    rewards = np.asarray([env.step({})[1] for _ in range(10)])
+    env.close()
+    assert any(not np.array_equal(rewards[:, 0], rewards[:, i]) 
+               for i in range(1, 4))
+
+
+def test_seeded_workers_repeat():
+    env = RDDLSubprocVectorEnv('Wildfire_MDP_ippc2014', '1', num_envs=4,
+                               num_workers=2, vectorized=True)
+    returns = []
+    for _ in range(2):
+        env.reset(seed=42)
+        returns.append([env.step({})[1] for _ in range(10)])
+    env.close()
+    assert np.array_equal(returns[0], returns[1])
+
+
+def test_close_leaves_no_tracker_warnings():
+    code = '''
+from pyRDDLGym.core.vector_env import RDDLSubprocVectorEnv
+for context in ('spawn', 'fork', 'forkserver'):
+    env = RDDLSubprocVectorEnv('Wildfire_MDP_ippc2014', '1', num_envs=2,
+                               num_workers=2, context=context)
+    env.reset(seed=0)
+    env.step({})
+    env.close()
+'''
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, 
+                            text=True, timeout=600)
+    assert result.returncode == 0, result.stderr
+    assert 'resource_tracker' not in result.stderr, result.stderr